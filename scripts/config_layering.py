@@ -27,6 +27,7 @@ PRIVATE_FILE_MODE = 0o600
 LOCK_OWNER_TOKEN = "owner-token"
 STAGE_PREFIX = ".my-opencode-config.stage-"
 _ACTIVE_LOCKS = threading.local()
+_PARSED_CONFIG_CACHE: dict[str, tuple[tuple[int, int, int, int], dict[str, Any]]] = {}
 
 Durability = Literal["not_committed", "synced", "uncertain", "partial"]
 
@@ -286,10 +287,31 @@ def _parse_config_text(content: str, path: Path) -> dict[str, Any]:
 
 
 def _load_json_or_jsonc(path: Path) -> dict[str, Any]:
+    # JSONC stripping is a per-character Python loop, so unchanged files reuse
+    # their parse; callers get a deep copy they are free to mutate.
+    key = os.fspath(path)
+    try:
+        metadata = os.stat(key)
+    except OSError:
+        stamp = None
+    else:
+        stamp = (
+            metadata.st_dev,
+            metadata.st_ino,
+            metadata.st_mtime_ns,
+            metadata.st_size,
+        )
+        cached = _PARSED_CONFIG_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
     raw = path.read_bytes()
     if len(raw) > MAX_CONFIG_BYTES:
         raise ValueError(f"Config exceeds {MAX_CONFIG_BYTES} bytes: {path}")
-    return _parse_config_text(raw.decode("utf-8", errors="strict"), path)
+    parsed = _parse_config_text(raw.decode("utf-8", errors="strict"), path)
+    if stamp is not None and len(raw) == stamp[3]:
+        _PARSED_CONFIG_CACHE[key] = (stamp, parsed)
+        return copy.deepcopy(parsed)
+    return parsed
 
 
 def _deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
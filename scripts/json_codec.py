@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None  # type: ignore[assignment]
+
+
+def fast_dumps(payload: Any, *, indent: bool = False) -> bytes | None:
+    # None means the caller should use its stdlib json path.
+    if orjson is None:
+        return None
+    option = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE if indent else 0
+    try:
+        return orjson.dumps(payload, option=option)
+    except TypeError:
+        return None
+
+
+def loads_bytes(data: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN, Infinity and lone surrogate escapes only parse with json.
+            pass
+    return json.loads(data.decode("utf-8"))
@@ -2,56 +2,74 @@
 
 from __future__ import annotations
 
-import difflib
+import fnmatch
 import json
+import os
 import re
 import shutil
+import stat
 import sys
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from config_layering import load_layered_config  # type: ignore
+from json_codec import fast_dumps  # type: ignore
 from lsp_rpc_client import LspClient, choose_server_for_path, uri_to_path  # type: ignore
-from safe_edit_adapters import validate_changed_references  # type: ignore
+from safe_edit_adapters import (  # type: ignore
+    validate_changed_references,
+    word_boundary_pattern,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - optional accelerator
+    re2 = None  # type: ignore[assignment]
 
 
 DEFAULT_LSP_SERVERS: list[dict[str, Any]] = [
     {
         "id": "typescript-language-server",
-        "command": ["typescript-language-server", "--stdio"],
+        "command": ("typescript-language-server", "--stdio"),
         "binary": "typescript-language-server",
         "language": "typescript/javascript",
-        "extensions": [".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"],
+        "extensions": (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"),
         "priority": -100,
         "source": "builtin",
         "install_hint": "npm install -g typescript typescript-language-server",
     },
     {
         "id": "pyright",
-        "command": ["pyright-langserver", "--stdio"],
+        "command": ("pyright-langserver", "--stdio"),
         "binary": "pyright-langserver",
         "language": "python",
-        "extensions": [".py"],
+        "extensions": (".py",),
         "priority": -100,
         "source": "builtin",
         "install_hint": "npm install -g pyright",
     },
     {
         "id": "rust-analyzer",
-        "command": ["rust-analyzer"],
+        "command": ("rust-analyzer",),
         "binary": "rust-analyzer",
         "language": "rust",
-        "extensions": [".rs"],
+        "extensions": (".rs",),
         "priority": -100,
         "source": "builtin",
         "install_hint": "Install rust-analyzer via rustup/components or package manager",
     },
     {
         "id": "gopls",
-        "command": ["gopls"],
+        "command": ("gopls",),
         "binary": "gopls",
         "language": "go",
-        "extensions": [".go"],
+        "extensions": (".go",),
         "priority": -100,
         "source": "builtin",
         "install_hint": "go install golang.org/x/tools/gopls@latest",
@@ -59,6 +77,30 @@ DEFAULT_LSP_SERVERS: list[dict[str, Any]] = [
 ]
 
 
+def _write_stdout_bytes(data: bytes) -> None:
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(data)
+
+
+def _emit_json(payload: dict[str, Any]) -> None:
+    encoded = fast_dumps(payload, indent=True)
+    if encoded is not None:
+        _write_stdout_bytes(encoded)
+        return
+    json.dump(payload, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def _print_lines(lines: Iterable[str]) -> None:
+    text = "\n".join(lines)
+    if text:
+        sys.stdout.write(text + "\n")
+
+
 def usage() -> int:
     print(
         "usage: /lsp status [--json] | /lsp doctor [--verbose] [--json] | "
@@ -73,19 +115,30 @@ def usage() -> int:
     return 2
 
 
-SUPPORTED_EXTENSIONS = {
-    ".py",
-    ".ts",
-    ".tsx",
-    ".js",
-    ".jsx",
-    ".mjs",
-    ".cjs",
-    ".go",
-    ".rs",
-}
+SUPPORTED_EXTENSIONS = frozenset(
+    {
+        ".py",
+        ".ts",
+        ".tsx",
+        ".js",
+        ".jsx",
+        ".mjs",
+        ".cjs",
+        ".go",
+        ".rs",
+    }
+)
+
+IGNORED_DIRS = frozenset(
+    {".git", ".beads", "node_modules", "__pycache__", ".ruff_cache"}
+)
+
+PARALLEL_SCAN_MIN_FILES = 4
 
-IGNORED_DIRS = {".git", ".beads", "node_modules", "__pycache__", ".ruff_cache"}
+FILE_CACHE_MAX_ENTRIES = 1024
+FILE_CACHE_MAX_FILE_BYTES = 64 * 1024
+_FILE_CACHE: OrderedDict[str, tuple[tuple[int, int], bytes]] = OrderedDict()
+_FILE_CACHE_LOCK = threading.Lock()
 
 
 def _coerce_string_list(value: Any) -> list[str]:
@@ -99,17 +152,24 @@ def _coerce_string_list(value: Any) -> list[str]:
     return out
 
 
-def _infer_language(extensions: list[str]) -> str:
-    ext_set = {ext.lower() for ext in extensions}
-    if ext_set & {".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"}:
-        return "typescript/javascript"
-    if ".py" in ext_set:
-        return "python"
-    if ".rs" in ext_set:
-        return "rust"
-    if ".go" in ext_set:
-        return "go"
-    return "custom"
+# Earlier groups win when a server covers several languages.
+LANGUAGE_EXTENSION_GROUPS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("typescript/javascript", (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")),
+    ("python", (".py",)),
+    ("rust", (".rs",)),
+    ("go", (".go",)),
+)
+EXTENSION_LANGUAGE_RANKS: dict[str, tuple[int, str]] = {
+    extension: (rank, language)
+    for rank, (language, extensions) in enumerate(LANGUAGE_EXTENSION_GROUPS)
+    for extension in extensions
+}
+
+
+def _infer_language(extensions: Iterable[str]) -> str:
+    ranked = (EXTENSION_LANGUAGE_RANKS.get(ext.lower()) for ext in extensions)
+    best = min((item for item in ranked if item is not None), default=None)
+    return best[1] if best is not None else "custom"
 
 
 def _resolve_servers() -> tuple[list[dict[str, Any]], dict[str, Any]]:
@@ -176,33 +236,43 @@ def _resolve_servers() -> tuple[list[dict[str, Any]], dict[str, Any]]:
     except Exception as exc:
         config_info["warnings"].append(f"failed to load layered config: {exc}")
 
-    servers: list[dict[str, Any]] = []
-    for server_id in sorted(
-        configured.keys(),
-        key=lambda item: (-int(configured[item].get("priority", 0)), item),
-    ):
-        servers.append(configured[server_id])
+    servers = sorted(
+        configured.values(), key=lambda entry: (-entry["priority"], entry["id"])
+    )
 
     for builtin in DEFAULT_LSP_SERVERS:
         server_id = str(builtin["id"])
         if server_id in disabled or server_id in configured:
             continue
-        servers.append(dict(builtin))
+        # Builtins hold tuples, so sharing them with the cached result is safe.
+        servers.append(builtin)
 
     config_info["configured_servers"] = len(configured)
     config_info["disabled_servers"] = sorted(disabled)
     return servers, config_info
 
 
+@lru_cache(maxsize=256)
+def _which_on_path(binary: str, search_path: str | None) -> str | None:
+    return shutil.which(binary, path=search_path)
+
+
+def _which(binary: str) -> str | None:
+    return _which_on_path(binary, os.environ.get("PATH"))
+
+
+def _is_installed(binary: str) -> bool:
+    if os.path.isabs(binary):
+        return os.path.isfile(binary) and os.access(binary, os.X_OK)
+    return _which(binary) is not None
+
+
 def _collect_servers() -> tuple[list[dict[str, Any]], dict[str, Any]]:
     resolved, config_info = _resolve_servers()
-    servers: list[dict[str, Any]] = []
-    for server in resolved:
-        binary = str(server["binary"])
-        installed = shutil.which(binary) is not None
-        row = dict(server)
-        row["installed"] = installed
-        servers.append(row)
+    servers = [
+        {**server, "installed": _is_installed(str(server["binary"]))}
+        for server in resolved
+    ]
     return servers, config_info
 
 
@@ -251,7 +321,7 @@ def _severity_label(value: Any) -> str:
 
 def _fallback_text_diagnostics(path: Path, root: Path) -> list[dict[str, Any]]:
     diagnostics: list[dict[str, Any]] = []
-    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    lines = _read_file_lines(path)
     relative = str(path.resolve().relative_to(root))
     for line_index, text in enumerate(lines, start=1):
         matched = COMMENT_MARKER_PATTERN.search(text)
@@ -500,27 +570,343 @@ def _code_action_summary(code_actions: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
+GLOB_WILDCARD_CHARS = frozenset("*?[")
+
+
+def _has_glob_wildcard(text: str) -> bool:
+    return any(char in GLOB_WILDCARD_CHARS for char in text)
+
+
+def _selects_directories(pattern: str) -> bool:
+    # Path.parts drops a trailing slash, which restricts a glob to directories.
+    return pattern.endswith(("/", os.sep))
+
+
+def _try_decompose_shallow_wildcard(pattern: str) -> tuple[str, str] | None:
+    parts = Path(pattern).parts
+    if not parts or Path(pattern).is_absolute() or _selects_directories(pattern):
+        return None
+    wildcard_indexes = [
+        index for index, part in enumerate(parts) if _has_glob_wildcard(part)
+    ]
+    if len(wildcard_indexes) != 1:
+        return None
+    index = wildcard_indexes[0]
+    if parts[index] != "*" or index == len(parts) - 1:
+        return None
+    prefix = "/".join(parts[:index])
+    suffix = "/".join(parts[index + 1 :])
+    return prefix, suffix
+
+
+def _is_literal_pattern(pattern: str) -> bool:
+    candidate = Path(pattern)
+    return (
+        bool(candidate.parts)
+        and not candidate.is_absolute()
+        and not _selects_directories(pattern)
+        and not _has_glob_wildcard(pattern)
+    )
+
+
+def _shallow_wildcard_candidates(root: Path, prefix: str, suffix: str) -> list[Path]:
+    base = root / prefix if prefix else root
+    candidates: list[Path] = []
+    try:
+        with os.scandir(base) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        candidates.append(base / entry.name / suffix)
+                except OSError:
+                    continue
+    except OSError:
+        return []
+    return candidates
+
+
+def _scandir_entries(
+    directory: str, listings: dict[str, list[os.DirEntry[str]]]
+) -> list[os.DirEntry[str]]:
+    entries = listings.get(directory)
+    if entries is None:
+        try:
+            with os.scandir(directory) as iterator:
+                entries = [
+                    entry for entry in iterator if entry.name not in IGNORED_DIRS
+                ]
+        except OSError:
+            entries = []
+        listings[directory] = entries
+    return entries
+
+
+def _has_supported_extension(path: str) -> bool:
+    extension = os.path.splitext(path)[1]
+    return (
+        extension in SUPPORTED_EXTENSIONS
+        or extension.lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def _recursive_directories(
+    directory: str, listings: dict[str, list[os.DirEntry[str]]]
+) -> Iterator[str]:
+    # Mirrors pathlib's `**`: symlinked directories are not descended into.
+    yield directory
+    for entry in _scandir_entries(directory, listings):
+        try:
+            descend = entry.is_dir() and not entry.is_symlink()
+        except OSError:
+            continue
+        if descend:
+            yield from _recursive_directories(entry.path, listings)
+
+
+def _select_pattern_files(
+    directory: str,
+    parts: tuple[str, ...],
+    listings: dict[str, list[os.DirEntry[str]]],
+) -> Iterator[str]:
+    part, rest = parts[0], parts[1:]
+    if part == "**":
+        # A trailing `**` only selects directories, which are never in scope.
+        if rest:
+            for start in _recursive_directories(directory, listings):
+                yield from _select_pattern_files(start, rest, listings)
+        return
+    if not _has_glob_wildcard(part):
+        if part in IGNORED_DIRS:
+            return
+        child = os.path.join(directory, part)
+        if not rest:
+            if _is_regular_file(child):
+                yield child
+        elif _is_directory(child):
+            yield from _select_pattern_files(child, rest, listings)
+        return
+    for entry in _scandir_entries(directory, listings):
+        if not rest and not _has_supported_extension(entry.name):
+            continue
+        if not fnmatch.fnmatchcase(entry.name, part):
+            continue
+        try:
+            selected = entry.is_dir() if rest else entry.is_file()
+        except OSError:
+            continue
+        if not selected:
+            continue
+        child = entry.path
+        if rest:
+            yield from _select_pattern_files(child, rest, listings)
+        else:
+            yield child
+
+
+def _glob_files(
+    root: Path, pattern: str, listings: dict[str, list[os.DirEntry[str]]]
+) -> Iterator[str]:
+    parts = Path(pattern).parts
+    if (
+        not parts
+        or Path(pattern).is_absolute()
+        or _selects_directories(pattern)
+        or any("**" in part and part != "**" for part in parts)
+    ):
+        # Let pathlib raise its usual errors for patterns it rejects.
+        return (
+            str(path)
+            for path in root.glob(pattern)
+            if _outside_ignored_dirs(str(path)) and _is_regular_file(path)
+        )
+    return _select_pattern_files(str(root), parts, listings)
+
+
+def _outside_ignored_dirs(path: str) -> bool:
+    return IGNORED_DIRS.isdisjoint(path.split(os.sep))
+
+
+def _stat_or_none(path: Path | str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_regular_file(path: Path | str) -> bool:
+    result = _stat_or_none(path)
+    return result is not None and stat.S_ISREG(result.st_mode)
+
+
+def _is_directory(path: Path | str) -> bool:
+    result = _stat_or_none(path)
+    return result is not None and stat.S_ISDIR(result.st_mode)
+
+
+@lru_cache(maxsize=1)
+def _scan_executor() -> ThreadPoolExecutor:
+    from concurrent.futures import ThreadPoolExecutor
+
+    return ThreadPoolExecutor(
+        max_workers=min(32, (os.cpu_count() or 1) * 4),
+        thread_name_prefix="lsp-scan",
+    )
+
+
+def _existing_files(candidates: list[Path]) -> list[Path]:
+    if len(candidates) <= PARALLEL_SCAN_MIN_FILES:
+        flags = [_is_regular_file(path) for path in candidates]
+    else:
+        flags = list(_scan_executor().map(_is_regular_file, candidates))
+    return [path for path, is_file in zip(candidates, flags) if is_file]
+
+
 def _discover_files(root: Path, patterns: list[str]) -> list[Path]:
-    seen: dict[str, Path] = {}
+    candidates: list[Path] = []
+    general: list[str] = []
     for pattern in patterns:
-        for path in root.glob(pattern):
-            if not path.is_file():
-                continue
-            if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-                continue
-            if any(part in IGNORED_DIRS for part in path.parts):
-                continue
-            resolved = path.resolve()
-            seen[str(resolved)] = resolved
-    return sorted(seen.values(), key=lambda item: str(item))
+        if _is_literal_pattern(pattern):
+            candidates.append(root / pattern)
+            continue
+        shallow = _try_decompose_shallow_wildcard(pattern)
+        if shallow is not None:
+            candidates.extend(_shallow_wildcard_candidates(root, *shallow))
+            continue
+        general.append(pattern)
+
+    matched = [
+        str(path)
+        for path in _existing_files(candidates)
+        if _outside_ignored_dirs(str(path))
+    ]
+    listings: dict[str, list[os.DirEntry[str]]] = {}
+    for pattern in general:
+        matched.extend(_glob_files(root, pattern, listings))
+    if not _outside_ignored_dirs(str(root)):
+        return []
+
+    seen = {
+        os.path.realpath(path) for path in matched if _has_supported_extension(path)
+    }
+    return [Path(path) for path in sorted(seen)]
+
+
+def _pattern_subsumes(broad: tuple[str, ...], narrow: tuple[str, ...]) -> bool:
+    # `prefix/**/tail` covers `prefix/<name>` when tail matches every name the
+    # narrower pattern can; deeper overlaps may differ through symlinked dirs.
+    if len(broad) < 2 or broad[-2] != "**" or broad == narrow:
+        return False
+    prefix, tail = broad[:-2], broad[-1]
+    if any(_has_glob_wildcard(part) for part in prefix) or tail == "**":
+        return False
+    if len(narrow) != len(prefix) + 1 or narrow[: len(prefix)] != prefix:
+        return False
+    return tail == "*" or tail == narrow[-1]
+
+
+def _normalize_scope(patterns: list[str]) -> list[str]:
+    unique = sorted(dict.fromkeys(patterns))
+    parts = {pattern: Path(pattern).parts for pattern in unique}
+    return [
+        pattern
+        for pattern in unique
+        if not any(
+            _pattern_subsumes(parts[other], parts[pattern])
+            for other in unique
+            if other != pattern and not _selects_directories(other)
+        )
+    ]
+
+
+def _discover_scope(root: Path, patterns: list[str]) -> list[Path]:
+    return _discover_files(root, _normalize_scope(patterns))
+
+
+def _invalidate_scope_caches() -> None:
+    _relative_uri_path.cache_clear()
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE.clear()
+
+
+def _read_file_bytes(path: Path) -> bytes:
+    key = str(path)
+    try:
+        status = os.stat(key)
+    except OSError:
+        return path.read_bytes()
+    stamp = (status.st_mtime_ns, status.st_size)
+    with _FILE_CACHE_LOCK:
+        cached = _FILE_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            _FILE_CACHE.move_to_end(key)
+            return cached[1]
+    data = path.read_bytes()
+    if len(data) > FILE_CACHE_MAX_FILE_BYTES:
+        return data
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE[key] = (stamp, data)
+        _FILE_CACHE.move_to_end(key)
+        while len(_FILE_CACHE) > FILE_CACHE_MAX_ENTRIES:
+            _FILE_CACHE.popitem(last=False)
+    return data
+
+
+def _read_file_lines(path: Path) -> list[str]:
+    return _read_file_bytes(path).decode("utf-8", errors="replace").splitlines()
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _is_identifier(symbol: str) -> bool:
+    return bool(symbol) and all(_is_word_char(char) for char in symbol)
+
+
+def _word_match_starts(text: str, word: str) -> Iterator[int]:
+    # Same non-overlapping hits as word_boundary_pattern(word) for identifiers.
+    size = len(word)
+    index = text.find(word)
+    while index >= 0:
+        end = index + size
+        if (index == 0 or not _is_word_char(text[index - 1])) and (
+            end == len(text) or not _is_word_char(text[end])
+        ):
+            yield index
+            index = text.find(word, end)
+        else:
+            index = text.find(word, index + 1)
+
+
+def _word_replace_fast(text: str, old: str, new: str) -> tuple[str, int]:
+    pieces: list[str] = []
+    count = 0
+    start = 0
+    for index in _word_match_starts(text, old):
+        pieces.append(text[start:index])
+        pieces.append(new)
+        start = index + len(old)
+        count += 1
+    if not count:
+        return text, 0
+    pieces.append(text[start:])
+    return "".join(pieces), count
+
+
+def _word_replace(text: str, symbol: str, new_name: str) -> tuple[str, int]:
+    # Identifier symbols only need neighbour checks; anything else (or a
+    # replacement that re.subn would treat as a template) keeps the regex.
+    if _is_identifier(symbol) and "\\" not in new_name:
+        return _word_replace_fast(text, symbol, new_name)
+    return word_boundary_pattern(symbol).subn(new_name, text)
 
 
 def _resolve_symbol_anchor(
     symbol: str, files: list[Path], root: Path
 ) -> dict[str, Any] | None:
-    pattern = re.compile(rf"\b{re.escape(symbol)}\b")
+    pattern = word_boundary_pattern(symbol)
     for path in files:
-        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+        lines = _read_file_lines(path)
         for index, line in enumerate(lines, start=1):
             matched = pattern.search(line)
             if matched:
@@ -533,12 +919,23 @@ def _resolve_symbol_anchor(
     return None
 
 
+@lru_cache(maxsize=1024)
+def _relative_uri_path(uri: str, root: Path) -> str | None:
+    path = uri_to_path(uri)
+    if path is None:
+        return None
+    try:
+        return str(path.resolve().relative_to(root))
+    except Exception:
+        return str(path)
+
+
 def _location_payload(item: dict[str, Any], root: Path) -> dict[str, Any] | None:
     uri = str(item.get("uri") or item.get("targetUri") or "").strip()
     if not uri:
         return None
-    path = uri_to_path(uri)
-    if path is None:
+    relative = _relative_uri_path(uri, root)
+    if relative is None:
         return None
     range_payload = item.get("range") or item.get("targetRange")
     if not isinstance(range_payload, dict):
@@ -548,10 +945,6 @@ def _location_payload(item: dict[str, Any], root: Path) -> dict[str, Any] | None
         return None
     line0 = int(start.get("line", 0))
     char0 = int(start.get("character", 0))
-    try:
-        relative = str(path.resolve().relative_to(root))
-    except Exception:
-        relative = str(path)
     return {
         "path": relative,
         "line": line0 + 1,
@@ -559,6 +952,99 @@ def _location_payload(item: dict[str, Any], root: Path) -> dict[str, Any] | None
     }
 
 
+def _parse_locations(raw_locations: Any, root: Path) -> list[dict[str, Any]]:
+    return [
+        location
+        for location in (
+            _location_payload(item, root)
+            for item in raw_locations
+            if isinstance(item, dict)
+        )
+        if location is not None
+    ]
+
+
+def _parse_document_symbols(
+    raw_symbols: Any, target: Path, root: Path
+) -> list[dict[str, Any]]:
+    parsed: list[dict[str, Any]] = []
+    target_relative = ""
+    for item in raw_symbols:
+        if not isinstance(item, dict):
+            continue
+        name = str(item.get("name") or "").strip()
+        if not name:
+            continue
+        location = item.get("location")
+        payload = (
+            _location_payload(location, root) if isinstance(location, dict) else None
+        )
+        if payload is not None:
+            line_value = payload["line"]
+            path_value = payload["path"]
+        else:
+            line_value = 1
+            target_relative = target_relative or str(target.relative_to(root))
+            path_value = target_relative
+        parsed.append(
+            {
+                "name": name,
+                "path": path_value,
+                "line": line_value,
+                "text": "",
+            }
+        )
+    return parsed
+
+
+def _parse_workspace_symbols(raw_symbols: Any, root: Path) -> list[dict[str, Any]]:
+    parsed: list[dict[str, Any]] = []
+    for item in raw_symbols:
+        if not isinstance(item, dict):
+            continue
+        name = str(item.get("name") or "").strip()
+        if not name:
+            continue
+        payload = _location_payload(item.get("location", {}), root)
+        if payload is None:
+            continue
+        parsed.append(
+            {
+                "name": name,
+                "path": payload["path"],
+                "line": payload["line"],
+                "text": "",
+            }
+        )
+    return parsed
+
+
+def _anchor_position(anchor: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "path": Path(anchor["path"]),
+        "line0": int(anchor["line"]) - 1,
+        "char0": int(anchor["character"]),
+    }
+
+
+def _invoke_lsp(
+    server: dict[str, Any],
+    root: Path,
+    command: str,
+    call: Callable[[LspClient], Any],
+) -> tuple[Any, str, str]:
+    try:
+        with LspClient(command=list(server["command"]), root=root) as client:
+            capability_ok, capability_reason = _preflight_server_capability(
+                client.server_capabilities, command
+            )
+            if not capability_ok:
+                return None, capability_reason, ""
+            return call(client), "", ""
+    except Exception as exc:
+        return None, "", str(exc)
+
+
 def _offset_for_position(text: str, line0: int, char0: int) -> int:
     if line0 < 0:
         return 0
@@ -677,7 +1163,14 @@ def _edit_plan_from_workspace_edit(
     root: Path,
     symbol: str,
     new_name: str,
-) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    keep_after: bool = False,
+    build_diff: bool = True,
+) -> tuple[
+    list[dict[str, Any]],
+    list[dict[str, Any]],
+    dict[str, dict[str, Any]],
+    bool,
+]:
     plan: list[dict[str, Any]] = []
     by_uri, resource_operations, change_annotations = _workspace_edit_text_changes(
         workspace_edit
@@ -708,15 +1201,23 @@ def _edit_plan_from_workspace_edit(
                 "edits": len(edits),
                 "validation": validation,
                 "annotation_ids": sorted(set(annotation_ids)),
-                "before": before,
-                "after": after,
+                "diff": _build_diff_preview(relative_path, before, after)
+                if build_diff
+                else None,
+                "before": before if keep_after and not build_diff else None,
+                "after": after if keep_after else None,
             }
         )
     used_annotations: dict[str, dict[str, Any]] = {}
+    needs_confirmation = False
     for annotation_id in sorted(used_annotation_ids):
         if annotation_id in change_annotations:
-            used_annotations[annotation_id] = change_annotations[annotation_id]
-    return plan, resource_operations, used_annotations
+            annotation = change_annotations[annotation_id]
+            used_annotations[annotation_id] = annotation
+            needs_confirmation = needs_confirmation or bool(
+                annotation["needs_confirmation"]
+            )
+    return plan, resource_operations, used_annotations, needs_confirmation
 
 
 def _backend_details(
@@ -745,14 +1246,28 @@ def _backend_details(
     }
 
 
+def _unified_diff_lines(path: str, before: str, after: str) -> Iterator[str]:
+    import difflib
+
+    return difflib.unified_diff(
+        before.splitlines(),
+        after.splitlines(),
+        fromfile=f"a/{path}",
+        tofile=f"b/{path}",
+        lineterm="",
+    )
+
+
 def _build_diff_preview(path: str, before: str, after: str) -> list[str]:
-    return list(
-        difflib.unified_diff(
-            before.splitlines(),
-            after.splitlines(),
-            fromfile=f"a/{path}",
-            tofile=f"b/{path}",
-            lineterm="",
+    return list(_unified_diff_lines(path, before, after))
+
+
+def _count_diff_lines(edit_plan: list[dict[str, Any]]) -> int:
+    return sum(
+        1
+        for row in edit_plan
+        for _ in _unified_diff_lines(
+            str(row["path"]), str(row["before"]), str(row["after"])
         )
     )
 
@@ -972,118 +1487,321 @@ def _resource_operation_targets(
     return targets
 
 
-def _definition_patterns(symbol: str, suffix: str) -> list[re.Pattern[str]]:
-    escaped = re.escape(symbol)
-    if suffix == ".py":
-        return [
-            re.compile(rf"^\s*def\s+{escaped}\s*\("),
-            re.compile(rf"^\s*class\s+{escaped}\b"),
-        ]
-    if suffix in {".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"}:
-        return [
-            re.compile(rf"^\s*function\s+{escaped}\s*\("),
-            re.compile(rf"^\s*(export\s+)?(const|let|var)\s+{escaped}\b"),
-            re.compile(rf"^\s*class\s+{escaped}\b"),
-        ]
-    if suffix == ".go":
-        return [
-            re.compile(rf"^\s*func\s+{escaped}\s*\("),
-            re.compile(rf"^\s*type\s+{escaped}\b"),
-        ]
-    if suffix == ".rs":
-        return [
-            re.compile(rf"^\s*fn\s+{escaped}\s*\("),
-            re.compile(rf"^\s*(pub\s+)?(struct|enum|trait|type)\s+{escaped}\b"),
-        ]
-    return [re.compile(rf"\b{escaped}\b")]
+SCRIPT_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+DEFINITION_TEMPLATES: dict[str, str] = {
+    ".py": r"^\s*(?:def\s+{symbol}\s*\(|class\s+{symbol}\b)",
+    **{
+        suffix: r"^\s*(?:function\s+{symbol}\s*\("
+        r"|(?:export\s+)?(?:const|let|var)\s+{symbol}\b"
+        r"|class\s+{symbol}\b)"
+        for suffix in SCRIPT_SUFFIXES
+    },
+    ".go": r"^\s*(?:func\s+{symbol}\s*\(|type\s+{symbol}\b)",
+    ".rs": r"^\s*(?:fn\s+{symbol}\s*\("
+    r"|(?:pub\s+)?(?:struct|enum|trait|type)\s+{symbol}\b)",
+}
+DEFAULT_DEFINITION_TEMPLATE = r"\b{symbol}\b"
+
+
+@lru_cache(maxsize=128)
+def _definition_pattern(symbol: str, suffix: str) -> re.Pattern[str]:
+    template = DEFINITION_TEMPLATES.get(suffix, DEFAULT_DEFINITION_TEMPLATE)
+    return re.compile(template.format(symbol=re.escape(symbol)))
+
+
+@lru_cache(maxsize=128)
+def _whole_text_pattern(pattern: re.Pattern[str]) -> re.Pattern[str]:
+    # For template patterns without escaped backslashes: ``^`` anchors every
+    # line and ``\s`` may no longer run across a newline.
+    return re.compile(
+        pattern.pattern.replace(r"\s", r"[^\S\n]"), pattern.flags | re.MULTILINE
+    )
+
+
+def _first_match_lines(
+    text: str, starts: Iterable[int]
+) -> Iterator[tuple[int, int, str]]:
+    line = 1
+    position = 0
+    last_line = 0
+    for start in starts:
+        line += text.count("\n", position, start)
+        position = start
+        if line == last_line:
+            continue
+        last_line = line
+        line_end = text.find("\n", start)
+        if line_end < 0:
+            line_end = len(text)
+        yield start, line, text[text.rfind("\n", 0, start) + 1 : line_end].strip()
+
+
+ScanRow = TypeVar("ScanRow")
+
+
+def _scan_files(
+    scan: Callable[[Path], list[ScanRow]], files: list[Path]
+) -> list[ScanRow]:
+    if len(files) <= PARALLEL_SCAN_MIN_FILES:
+        per_file = [scan(path) for path in files]
+    else:
+        per_file = list(_scan_executor().map(scan, files))
+    return [row for rows in per_file for row in rows]
+
+
+def _write_planned_files(root: Path, edit_plan: list[dict[str, Any]]) -> None:
+    writes = [(root / str(row["path"]), str(row.pop("after"))) for row in edit_plan]
+
+    def write(item: tuple[Path, str]) -> None:
+        item[0].write_text(item[1], encoding="utf-8")
+
+    if len(writes) <= PARALLEL_SCAN_MIN_FILES:
+        for item in writes:
+            write(item)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = min(8, len(writes))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(write, writes))
+
+
+def _read_text_containing(path: Path, symbol: str) -> str:
+    data = _read_file_bytes(path)
+    if symbol.encode("utf-8") not in data:
+        return ""
+    return data.decode("utf-8", errors="replace")
+
+
+def _scan_definitions_in_text(
+    symbol: str, pattern: re.Pattern[str], text: str, path: Path, root: Path
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    relative = ""
+    if text and _is_identifier(symbol) and not EXTRA_LINE_BREAKS.search(text):
+        matches = _whole_text_pattern(pattern).finditer(text)
+        starts = (matched.start() for matched in matches)
+        for _, line, line_text in _first_match_lines(text, starts):
+            relative = relative or str(path.relative_to(root))
+            results.append({"path": relative, "line": line, "text": line_text})
+        return results
+
+    for idx, line in enumerate(text.splitlines(), start=1):
+        if symbol not in line:
+            continue
+        if pattern.search(line):
+            relative = relative or str(path.relative_to(root))
+            results.append(
+                {
+                    "path": relative,
+                    "line": idx,
+                    "text": line.strip(),
+                }
+            )
+    return results
+
+
+def _definition_patterns(symbol: str, files: list[Path]) -> dict[str, re.Pattern[str]]:
+    return {
+        suffix: _definition_pattern(symbol, suffix)
+        for suffix in {path.suffix.lower() for path in files}
+    }
 
 
 def _scan_definitions(
     symbol: str, files: list[Path], root: Path
 ) -> list[dict[str, Any]]:
+    patterns = _definition_patterns(symbol, files)
+    return _scan_files(
+        lambda path: _scan_definitions_in_text(
+            symbol,
+            patterns[path.suffix.lower()],
+            _read_text_containing(path, symbol),
+            path,
+            root,
+        ),
+        files,
+    )
+
+
+@lru_cache(maxsize=64)
+def _ascii_word_pattern(symbol: str) -> Any:
+    # RE2's \b only knows ASCII word chars, so it is used for ASCII lines only.
+    if re2 is None or not symbol.isascii():
+        return None
+    try:
+        return re2.compile(rf"\b{re.escape(symbol)}\b")
+    except Exception:
+        return None
+
+
+# Line breaks str.splitlines() honours besides "\n".
+EXTRA_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def _scan_references_in_text(
+    symbol: str, pattern: re.Pattern[str], text: str, path: Path, root: Path
+) -> list[dict[str, Any]]:
+    if not text:
+        return []
+    if "\n" in symbol or EXTRA_LINE_BREAKS.search(text):
+        return _scan_reference_lines(symbol, pattern, text.splitlines(), path, root)
+
+    if _is_identifier(symbol):
+        starts = _word_match_starts(text, symbol)
+    else:
+        ascii_pattern = _ascii_word_pattern(symbol)
+        matcher = (
+            ascii_pattern if ascii_pattern is not None and text.isascii() else pattern
+        )
+        starts = (matched.start() for matched in matcher.finditer(text))
     results: list[dict[str, Any]] = []
-    for path in files:
-        patterns = _definition_patterns(symbol, path.suffix.lower())
-        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
-        for idx, line in enumerate(lines, start=1):
-            if any(pattern.search(line) for pattern in patterns):
-                results.append(
-                    {
-                        "path": str(path.relative_to(root)),
-                        "line": idx,
-                        "text": line.strip(),
-                    }
-                )
+    relative = ""
+    for _, line, line_text in _first_match_lines(text, starts):
+        relative = relative or str(path.relative_to(root))
+        results.append({"path": relative, "line": line, "text": line_text})
     return results
 
 
-def _scan_references(
-    symbol: str, files: list[Path], root: Path
+def _scan_reference_lines(
+    symbol: str,
+    pattern: re.Pattern[str],
+    lines: list[str],
+    path: Path,
+    root: Path,
 ) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
-    pattern = re.compile(rf"\b{re.escape(symbol)}\b")
-    for path in files:
-        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
-        for idx, line in enumerate(lines, start=1):
-            if pattern.search(line):
-                results.append(
-                    {
-                        "path": str(path.relative_to(root)),
-                        "line": idx,
-                        "text": line.strip(),
-                    }
-                )
+    ascii_pattern = _ascii_word_pattern(symbol) if lines else None
+    relative = ""
+    for idx, line in enumerate(lines, start=1):
+        if symbol not in line:
+            continue
+        matcher = (
+            ascii_pattern if ascii_pattern is not None and line.isascii() else pattern
+        )
+        if matcher.search(line):
+            relative = relative or str(path.relative_to(root))
+            results.append(
+                {
+                    "path": relative,
+                    "line": idx,
+                    "text": line.strip(),
+                }
+            )
     return results
 
 
-def _symbol_patterns(suffix: str) -> list[re.Pattern[str]]:
-    if suffix == ".py":
-        return [
-            re.compile(r"^\s*def\s+([A-Za-z_][A-Za-z0-9_]*)\s*\("),
-            re.compile(r"^\s*class\s+([A-Za-z_][A-Za-z0-9_]*)\b"),
-        ]
-    if suffix in {".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"}:
-        return [
-            re.compile(r"^\s*function\s+([A-Za-z_][A-Za-z0-9_]*)\s*\("),
-            re.compile(
-                r"^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_][A-Za-z0-9_]*)\b"
-            ),
-            re.compile(r"^\s*class\s+([A-Za-z_][A-Za-z0-9_]*)\b"),
-        ]
-    if suffix == ".go":
-        return [
-            re.compile(r"^\s*func\s+([A-Za-z_][A-Za-z0-9_]*)\s*\("),
-            re.compile(r"^\s*type\s+([A-Za-z_][A-Za-z0-9_]*)\b"),
-        ]
-    if suffix == ".rs":
+def _scan_references(
+    symbol: str, files: list[Path], root: Path
+) -> list[dict[str, Any]]:
+    pattern = word_boundary_pattern(symbol)
+    return _scan_files(
+        lambda path: _scan_references_in_text(
+            symbol, pattern, _read_text_containing(path, symbol), path, root
+        ),
+        files,
+    )
+
+
+def _scan_definitions_and_references(
+    symbol: str, files: list[Path], root: Path
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    definition_patterns = _definition_patterns(symbol, files)
+    reference_pattern = word_boundary_pattern(symbol)
+
+    def scan(path: Path) -> list[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+        text = _read_text_containing(path, symbol)
+        if not text:
+            return []
+        pattern = definition_patterns[path.suffix.lower()]
         return [
-            re.compile(r"^\s*fn\s+([A-Za-z_][A-Za-z0-9_]*)\s*\("),
-            re.compile(
-                r"^\s*(?:pub\s+)?(?:struct|enum|trait|type)\s+([A-Za-z_][A-Za-z0-9_]*)\b"
-            ),
+            (
+                _scan_definitions_in_text(symbol, pattern, text, path, root),
+                _scan_references_in_text(symbol, reference_pattern, text, path, root),
+            )
         ]
-    return []
 
+    per_file = _scan_files(scan, files)
+    definitions = [row for rows, _ in per_file for row in rows]
+    references = [row for _, rows in per_file for row in rows]
+    return definitions, references
+
+
+SYMBOL_NAME = r"([A-Za-z_][A-Za-z0-9_]*)"
+
+
+def _symbol_alternation(*alternatives: str) -> re.Pattern[str]:
+    # One capturing group per alternative; ``lastindex`` names the one that hit.
+    return re.compile(r"^\s*(?:" + "|".join(alternatives) + ")")
+
+
+SYMBOL_PATTERNS: dict[str, re.Pattern[str]] = {
+    ".py": _symbol_alternation(
+        rf"def\s+{SYMBOL_NAME}\s*\(",
+        rf"class\s+{SYMBOL_NAME}\b",
+    ),
+    **dict.fromkeys(
+        SCRIPT_SUFFIXES,
+        _symbol_alternation(
+            rf"function\s+{SYMBOL_NAME}\s*\(",
+            rf"(?:export\s+)?(?:const|let|var)\s+{SYMBOL_NAME}\b",
+            rf"class\s+{SYMBOL_NAME}\b",
+        ),
+    ),
+    ".go": _symbol_alternation(
+        rf"func\s+{SYMBOL_NAME}\s*\(",
+        rf"type\s+{SYMBOL_NAME}\b",
+    ),
+    ".rs": _symbol_alternation(
+        rf"fn\s+{SYMBOL_NAME}\s*\(",
+        rf"(?:pub\s+)?(?:struct|enum|trait|type)\s+{SYMBOL_NAME}\b",
+    ),
+}
+
+
+def _symbol_hits(text: str, pattern: re.Pattern[str]) -> Iterator[tuple[int, str, str]]:
+    if not EXTRA_LINE_BREAKS.search(text):
+        matches = {
+            matched.start(): matched
+            for matched in _whole_text_pattern(pattern).finditer(text)
+        }
+        for start, line, line_text in _first_match_lines(text, matches):
+            matched = matches[start]
+            yield line, line_text, matched.group(matched.lastindex or 0)
+        return
 
-def _extract_symbols(path: Path, root: Path) -> list[dict[str, Any]]:
+    for idx, line in enumerate(text.splitlines(), start=1):
+        matched = pattern.search(line)
+        if matched:
+            yield idx, line.strip(), matched.group(matched.lastindex or 0)
+
+
+def _extract_symbols(
+    path: Path, root: Path, query_lower: str = ""
+) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
-    patterns = _symbol_patterns(path.suffix.lower())
-    if not patterns:
+    pattern = SYMBOL_PATTERNS.get(path.suffix.lower())
+    if pattern is None:
         return results
-    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
-    for idx, line in enumerate(lines, start=1):
-        for pattern in patterns:
-            matched = pattern.search(line)
-            if matched:
-                results.append(
-                    {
-                        "name": matched.group(1),
-                        "path": str(path.relative_to(root)),
-                        "line": idx,
-                        "text": line.strip(),
-                    }
-                )
-                break
+    data = _read_file_bytes(path)
+    # Symbol names are ASCII, so a hit needs the query in the lowered bytes.
+    if query_lower and query_lower.encode("utf-8") not in data.lower():
+        return results
+    text = data.decode("utf-8", errors="replace")
+    relative = ""
+    for line, line_text, name in _symbol_hits(text, pattern):
+        if query_lower not in name.lower():
+            continue
+        relative = relative or str(path.relative_to(root))
+        results.append(
+            {
+                "name": name,
+                "path": relative,
+                "line": line,
+                "text": line_text,
+            }
+        )
     return results
 
 
@@ -1124,7 +1842,7 @@ def command_goto_definition(args: list[str]) -> int:
     symbol, scope_patterns, as_json = parsed
 
     root = Path.cwd()
-    files = _discover_files(root, scope_patterns)
+    files = _discover_scope(root, scope_patterns)
     servers, _ = _collect_servers()
     anchor = _resolve_symbol_anchor(symbol, files, root)
     lsp_error = ""
@@ -1139,35 +1857,21 @@ def command_goto_definition(args: list[str]) -> int:
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "goto-definition"
-                    )
-                    if capability_ok:
-                        raw_locations = client.goto_definition(
-                            path=Path(anchor["path"]),
-                            line0=int(anchor["line"]) - 1,
-                            char0=int(anchor["character"]),
-                        )
-                    else:
-                        raw_locations = []
-                        reason_code = capability_reason
-                parsed = [
-                    location
-                    for location in (
-                        _location_payload(item, root)
-                        for item in raw_locations
-                        if isinstance(item, dict)
-                    )
-                    if location is not None
-                ]
-                if parsed:
-                    definitions = parsed
-                    backend = "lsp"
-                    reason_code = "lsp_protocol_success"
-            except Exception as exc:
-                lsp_error = str(exc)
+            position = _anchor_position(anchor)
+            parsed, capability_reason, lsp_error = _invoke_lsp(
+                server,
+                root,
+                "goto-definition",
+                lambda client: _parse_locations(
+                    client.goto_definition(**position), root
+                ),
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if parsed:
+                definitions = parsed
+                backend = "lsp"
+                reason_code = "lsp_protocol_success"
 
     if not definitions:
         definitions = _scan_definitions(symbol, files, root)
@@ -1193,15 +1897,16 @@ def command_goto_definition(args: list[str]) -> int:
     }
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"symbol: {symbol}")
         print(f"definitions: {len(definitions)}")
         for warning in warnings:
             print(f"- warning: {warning}")
-        for row in definitions[:20]:
-            print(f"- {row['path']}:{row['line']} {row['text']}")
+        _print_lines(
+            f"- {row['path']}:{row['line']} {row['text']}" for row in definitions[:20]
+        )
     return 0
 
 
@@ -1212,7 +1917,7 @@ def command_find_references(args: list[str]) -> int:
     symbol, scope_patterns, as_json = parsed
 
     root = Path.cwd()
-    files = _discover_files(root, scope_patterns)
+    files = _discover_scope(root, scope_patterns)
     servers, _ = _collect_servers()
     anchor = _resolve_symbol_anchor(symbol, files, root)
     lsp_error = ""
@@ -1227,35 +1932,21 @@ def command_find_references(args: list[str]) -> int:
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "find-references"
-                    )
-                    if capability_ok:
-                        raw_locations = client.find_references(
-                            path=Path(anchor["path"]),
-                            line0=int(anchor["line"]) - 1,
-                            char0=int(anchor["character"]),
-                        )
-                    else:
-                        raw_locations = []
-                        reason_code = capability_reason
-                parsed = [
-                    location
-                    for location in (
-                        _location_payload(item, root)
-                        for item in raw_locations
-                        if isinstance(item, dict)
-                    )
-                    if location is not None
-                ]
-                if parsed:
-                    references = parsed
-                    backend = "lsp"
-                    reason_code = "lsp_protocol_success"
-            except Exception as exc:
-                lsp_error = str(exc)
+            position = _anchor_position(anchor)
+            parsed, capability_reason, lsp_error = _invoke_lsp(
+                server,
+                root,
+                "find-references",
+                lambda client: _parse_locations(
+                    client.find_references(**position), root
+                ),
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if parsed:
+                references = parsed
+                backend = "lsp"
+                reason_code = "lsp_protocol_success"
 
     if not references:
         references = _scan_references(symbol, files, root)
@@ -1282,15 +1973,16 @@ def command_find_references(args: list[str]) -> int:
     }
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"symbol: {symbol}")
         print(f"references: {len(references)}")
         for warning in warnings:
             print(f"- warning: {warning}")
-        for row in references[:40]:
-            print(f"- {row['path']}:{row['line']} {row['text']}")
+        _print_lines(
+            f"- {row['path']}:{row['line']} {row['text']}" for row in references[:40]
+        )
     return 0
 
 
@@ -1355,7 +2047,7 @@ def command_symbols(args: list[str]) -> int:
                 ),
             }
             if as_json:
-                print(json.dumps(payload, indent=2))
+                _emit_json(payload)
             else:
                 print(f"result: WARN\nfile: {file_value}")
             return 0
@@ -1370,49 +2062,20 @@ def command_symbols(args: list[str]) -> int:
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "symbols-document"
-                    )
-                    raw_symbols = (
-                        client.document_symbols(target) if capability_ok else []
-                    )
-                    if not capability_ok:
-                        reason_code = capability_reason
-                parsed: list[dict[str, Any]] = []
-                for item in raw_symbols:
-                    if not isinstance(item, dict):
-                        continue
-                    name = str(item.get("name") or "").strip()
-                    if not name:
-                        continue
-                    location = item.get("location")
-                    if isinstance(location, dict):
-                        payload = _location_payload(location, root)
-                        line_value = payload["line"] if payload else 1
-                        path_value = (
-                            payload["path"]
-                            if payload
-                            else str(target.relative_to(root))
-                        )
-                    else:
-                        line_value = 1
-                        path_value = str(target.relative_to(root))
-                    parsed.append(
-                        {
-                            "name": name,
-                            "path": path_value,
-                            "line": line_value,
-                            "text": "",
-                        }
-                    )
-                if parsed:
-                    symbols = parsed
-                    backend = "lsp"
-                    reason_code = "lsp_protocol_success"
-            except Exception as exc:
-                lsp_error = str(exc)
+            parsed, capability_reason, lsp_error = _invoke_lsp(
+                server,
+                root,
+                "symbols-document",
+                lambda client: _parse_document_symbols(
+                    client.document_symbols(target), target, root
+                ),
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if parsed:
+                symbols = parsed
+                backend = "lsp"
+                reason_code = "lsp_protocol_success"
 
         report = {
             "result": "PASS" if symbols else "WARN",
@@ -1433,14 +2096,11 @@ def command_symbols(args: list[str]) -> int:
     elif view == "workspace":
         if not query or not scope_patterns:
             return usage()
-        files = _discover_files(root, scope_patterns)
-        symbols: list[dict[str, Any]] = []
-        for path in files:
-            symbols.extend(_extract_symbols(path, root))
+        files = _discover_scope(root, scope_patterns)
         lowered = query.lower()
-        filtered = [
-            row for row in symbols if lowered in str(row.get("name", "")).lower()
-        ]
+        filtered = _scan_files(
+            lambda path: _extract_symbols(path, root, lowered), files
+        )
         backend = "text"
         reason_code = "lsp_text_fallback_used"
         lsp_error = ""
@@ -1453,42 +2113,20 @@ def command_symbols(args: list[str]) -> int:
             if server is not None:
                 attempted_protocol = True
                 selected_server = server
-                try:
-                    with LspClient(
-                        command=list(server["command"]), root=root
-                    ) as client:
-                        capability_ok, capability_reason = _preflight_server_capability(
-                            client.server_capabilities, "symbols-workspace"
-                        )
-                        raw_symbols = (
-                            client.workspace_symbols(query) if capability_ok else []
-                        )
-                        if not capability_ok:
-                            reason_code = capability_reason
-                    parsed: list[dict[str, Any]] = []
-                    for item in raw_symbols:
-                        if not isinstance(item, dict):
-                            continue
-                        name = str(item.get("name") or "").strip()
-                        if not name:
-                            continue
-                        payload = _location_payload(item.get("location", {}), root)
-                        if payload is None:
-                            continue
-                        parsed.append(
-                            {
-                                "name": name,
-                                "path": payload["path"],
-                                "line": payload["line"],
-                                "text": "",
-                            }
-                        )
-                    if parsed:
-                        workspace_symbols = parsed
-                        backend = "lsp"
-                        reason_code = "lsp_protocol_success"
-                except Exception as exc:
-                    lsp_error = str(exc)
+                parsed, capability_reason, lsp_error = _invoke_lsp(
+                    server,
+                    root,
+                    "symbols-workspace",
+                    lambda client: _parse_workspace_symbols(
+                        client.workspace_symbols(query), root
+                    ),
+                )
+                if capability_reason:
+                    reason_code = capability_reason
+                if parsed:
+                    workspace_symbols = parsed
+                    backend = "lsp"
+                    reason_code = "lsp_protocol_success"
 
         report = {
             "result": "PASS" if workspace_symbols else "WARN",
@@ -1517,14 +2155,16 @@ def command_symbols(args: list[str]) -> int:
     report["warnings"] = warnings
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"symbols: {len(report.get('symbols', []))}")
         for warning in warnings:
             print(f"- warning: {warning}")
-        for row in report.get("symbols", [])[:30]:
-            print(f"- {row['name']} {row['path']}:{row['line']}")
+        _print_lines(
+            f"- {row['name']} {row['path']}:{row['line']}"
+            for row in report.get("symbols", [])[:30]
+        )
     return 0
 
 
@@ -1535,7 +2175,7 @@ def command_diagnostics(args: list[str]) -> int:
     scope_patterns, as_json = parsed
 
     root = Path.cwd()
-    files = _discover_files(root, scope_patterns)
+    files = _discover_scope(root, scope_patterns)
     servers, _ = _collect_servers()
     diagnostics: list[dict[str, Any]] = []
     backend = "text"
@@ -1546,29 +2186,27 @@ def command_diagnostics(args: list[str]) -> int:
 
     for path in files:
         server = choose_server_for_path(path, servers)
-        protocol_diagnostics: list[dict[str, Any]] = []
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "diagnostics"
-                    )
-                    if capability_ok:
-                        protocol_diagnostics = _normalize_protocol_diagnostics(
-                            client.document_diagnostics(path), path, root
-                        )
-                    else:
-                        reason_code = capability_reason
-                if protocol_diagnostics:
-                    backend = "lsp"
-                    reason_code = "lsp_protocol_success"
-                    diagnostics.extend(protocol_diagnostics)
-                    continue
-            except Exception as exc:
-                lsp_error = str(exc)
+            protocol_diagnostics, capability_reason, error = _invoke_lsp(
+                server,
+                root,
+                "diagnostics",
+                lambda client: _normalize_protocol_diagnostics(
+                    client.document_diagnostics(path), path, root
+                ),
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if error:
+                lsp_error = error
                 reason_code = "lsp_protocol_error_fallback"
+            if protocol_diagnostics:
+                backend = "lsp"
+                reason_code = "lsp_protocol_success"
+                diagnostics.extend(protocol_diagnostics)
+                continue
         diagnostics.extend(_fallback_text_diagnostics(path, root))
 
     summary = _diagnostic_summary(diagnostics, len(files))
@@ -1591,7 +2229,7 @@ def command_diagnostics(args: list[str]) -> int:
         ),
     }
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"diagnostics: {summary['total']}")
@@ -1631,7 +2269,7 @@ def command_code_actions(args: list[str]) -> int:
         if candidate.exists() and candidate.is_file():
             target_path = candidate
     else:
-        scoped_files = _discover_files(root, scope_patterns)
+        scoped_files = _discover_scope(root, scope_patterns)
         anchor = _resolve_symbol_anchor(symbol_value, scoped_files, root)
         if anchor is not None:
             target_path = Path(anchor["path"])
@@ -1651,36 +2289,38 @@ def command_code_actions(args: list[str]) -> int:
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "code-actions"
-                    )
-                    if capability_ok:
-                        raw_actions = client.code_actions(
-                            target_path,
-                            line0=max(anchor_line0, 0),
-                            char0=max(anchor_char0, 0),
-                        )
-                        code_actions = _normalize_code_actions(
-                            raw_actions, target_path, root
-                        )
-                        if kind_prefix:
-                            paired = [
-                                (raw_action, action)
-                                for raw_action, action in zip(raw_actions, code_actions)
-                                if str(action.get("kind") or "").startswith(kind_prefix)
-                            ]
-                            raw_actions = [item[0] for item in paired]
-                            code_actions = [item[1] for item in paired]
-                    else:
-                        reason_code = capability_reason
-                if code_actions:
-                    backend = "lsp"
-                    reason_code = "lsp_protocol_success"
-            except Exception as exc:
-                lsp_error = str(exc)
+
+            def request_actions(
+                client: LspClient,
+            ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+                raw = client.code_actions(
+                    target_path,
+                    line0=max(anchor_line0, 0),
+                    char0=max(anchor_char0, 0),
+                )
+                normalized = _normalize_code_actions(raw, target_path, root)
+                if kind_prefix:
+                    paired = [
+                        (raw_action, action)
+                        for raw_action, action in zip(raw, normalized)
+                        if str(action.get("kind") or "").startswith(kind_prefix)
+                    ]
+                    raw = [item[0] for item in paired]
+                    normalized = [item[1] for item in paired]
+                return raw, normalized
+
+            requested, capability_reason, lsp_error = _invoke_lsp(
+                server, root, "code-actions", request_actions
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if lsp_error:
                 reason_code = "lsp_protocol_error_fallback"
+            if requested is not None:
+                raw_actions, code_actions = requested
+            if code_actions:
+                backend = "lsp"
+                reason_code = "lsp_protocol_success"
         else:
             reason_code = "lsp_server_not_available_for_target"
     else:
@@ -1736,6 +2376,7 @@ def command_code_actions(args: list[str]) -> int:
                         applied_files.append(str(row["path"]))
                         applied_edits += int(row["edits"])
                     applied = True
+                    _invalidate_scope_caches()
 
     warnings = _command_warnings(reason_code, lsp_error)
     summary = _code_action_summary(code_actions)
@@ -1757,7 +2398,7 @@ def command_code_actions(args: list[str]) -> int:
         "selected_action": selected_action,
         "summary": summary,
         "warnings": warnings,
-        "blockers": sorted(set(blockers)),
+        "blockers": sorted(dict.fromkeys(blockers)),
         "scanned_files": len(scoped_files),
         "target": str(target_path.resolve().relative_to(root))
         if isinstance(target_path, Path)
@@ -1773,7 +2414,7 @@ def command_code_actions(args: list[str]) -> int:
         ),
     }
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"target: {report['target']}")
@@ -1881,41 +2522,33 @@ def command_prepare_rename(args: list[str]) -> int:
     symbol, new_name, scope_patterns, _, _, _, _, _, _, _, as_json = parsed
 
     root = Path.cwd()
-    files = _discover_files(root, scope_patterns)
-    definitions = _scan_definitions(symbol, files, root)
-    references = _scan_references(symbol, files, root)
-    servers, _ = _collect_servers()
+    files = _discover_scope(root, scope_patterns)
+    definitions, references = _scan_definitions_and_references(symbol, files, root)
     backend = "text"
     reason_code = "lsp_text_fallback_used"
     lsp_error = ""
     attempted_protocol = False
     selected_server: dict[str, Any] | None = None
 
-    anchor = _resolve_symbol_anchor(symbol, files, root)
+    anchor = _resolve_symbol_anchor(symbol, files, root) if references else None
     if anchor is not None:
+        servers, _ = _collect_servers()
         server = choose_server_for_path(Path(anchor["path"]), servers)
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "prepare-rename"
-                    )
-                    if capability_ok:
-                        prepare_payload = client.prepare_rename(
-                            path=Path(anchor["path"]),
-                            line0=int(anchor["line"]) - 1,
-                            char0=int(anchor["character"]),
-                        )
-                    else:
-                        prepare_payload = None
-                        reason_code = capability_reason
-                if prepare_payload is not None:
-                    backend = "lsp"
-                    reason_code = "lsp_protocol_success"
-            except Exception as exc:
-                lsp_error = str(exc)
+            position = _anchor_position(anchor)
+            prepare_payload, capability_reason, lsp_error = _invoke_lsp(
+                server,
+                root,
+                "prepare-rename",
+                lambda client: client.prepare_rename(**position),
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if prepare_payload is not None:
+                backend = "lsp"
+                reason_code = "lsp_protocol_success"
 
     issues: list[str] = []
     if not references:
@@ -1953,7 +2586,7 @@ def command_prepare_rename(args: list[str]) -> int:
     }
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"can_rename: {report['can_rename']}")
@@ -1983,89 +2616,110 @@ def command_rename(args: list[str]) -> int:
     ) = parsed
 
     root = Path.cwd()
-    files = _discover_files(root, scope_patterns)
+    files = _discover_scope(root, scope_patterns)
     references = _scan_references(symbol, files, root)
-    pattern = re.compile(rf"\b{re.escape(symbol)}\b")
-    servers, _ = _collect_servers()
     backend = "text"
     reason_code = "lsp_text_fallback_used"
     lsp_error = ""
     edit_plan: list[dict[str, Any]] = []
     resource_operations: list[dict[str, Any]] = []
     change_annotations: dict[str, dict[str, Any]] = {}
+    needs_confirmation = False
     attempted_protocol = False
     selected_server: dict[str, Any] | None = None
 
-    anchor = _resolve_symbol_anchor(symbol, files, root)
+    anchor = _resolve_symbol_anchor(symbol, files, root) if references else None
     if anchor is not None:
+        servers, _ = _collect_servers()
         server = choose_server_for_path(Path(anchor["path"]), servers)
         if server is not None:
             attempted_protocol = True
             selected_server = server
-            try:
-                with LspClient(command=list(server["command"]), root=root) as client:
-                    capability_ok, capability_reason = _preflight_server_capability(
-                        client.server_capabilities, "rename"
-                    )
-                    if capability_ok:
-                        workspace_edit = client.rename(
-                            path=Path(anchor["path"]),
-                            line0=int(anchor["line"]) - 1,
-                            char0=int(anchor["character"]),
-                            new_name=new_name,
-                        )
-                    else:
-                        workspace_edit = None
-                        reason_code = capability_reason
-                if isinstance(workspace_edit, dict):
-                    edit_plan, resource_operations, change_annotations = (
-                        _edit_plan_from_workspace_edit(
-                            workspace_edit=workspace_edit,
-                            root=root,
-                            symbol=symbol,
-                            new_name=new_name,
-                        )
-                    )
-                    if edit_plan:
-                        backend = "lsp"
-                        reason_code = "lsp_protocol_success"
-            except Exception as exc:
-                lsp_error = str(exc)
-
-    if not edit_plan:
-        for path in files:
-            before = path.read_text(encoding="utf-8", errors="replace")
-            replaced, count = pattern.subn(new_name, before)
+            position = _anchor_position(anchor)
+
+            def plan_rename(client: LspClient) -> Any:
+                workspace_edit = client.rename(**position, new_name=new_name)
+                if not isinstance(workspace_edit, dict):
+                    return None
+                return _edit_plan_from_workspace_edit(
+                    workspace_edit=workspace_edit,
+                    root=root,
+                    symbol=symbol,
+                    new_name=new_name,
+                    keep_after=apply_changes,
+                    build_diff=as_json,
+                )
+
+            planned, capability_reason, lsp_error = _invoke_lsp(
+                server, root, "rename", plan_rename
+            )
+            if capability_reason:
+                reason_code = capability_reason
+            if planned is not None:
+                (
+                    edit_plan,
+                    resource_operations,
+                    change_annotations,
+                    needs_confirmation,
+                ) = planned
+                if edit_plan:
+                    backend = "lsp"
+                    reason_code = "lsp_protocol_success"
+
+    if not edit_plan and references:
+
+        def plan_text_rename(path: Path) -> list[dict[str, Any]]:
+            before = _read_text_containing(path, symbol)
+            if not before:
+                return []
+            if "\r" in before:
+                # Keep read_text()'s universal-newline translation.
+                before = before.replace("\r\n", "\n").replace("\r", "\n")
+            replaced, count = _word_replace(before, symbol, new_name)
             if count == 0:
-                continue
+                return []
             validation = validate_changed_references(before, replaced, symbol, new_name)
-            edit_plan.append(
+            relative_path = str(path.relative_to(root))
+            return [
                 {
-                    "path": str(path.relative_to(root)),
+                    "path": relative_path,
                     "edits": count,
                     "validation": validation,
-                    "before": before,
-                    "after": replaced,
+                    "diff": _build_diff_preview(relative_path, before, replaced)
+                    if as_json
+                    else None,
+                    "before": before if apply_changes and not as_json else None,
+                    "after": replaced if apply_changes else None,
                 }
-            )
+            ]
+
+        edit_plan = _scan_files(plan_text_rename, files)
 
     renamefile_operations, blocked_resource_ops = _split_resource_operations(
         resource_operations
     )
     grouped_resource_ops = _group_resource_operations(resource_operations)
-    diff_preview = [
-        {
-            "path": str(row["path"]),
-            "diff": _build_diff_preview(
-                path=str(row["path"]),
-                before=str(row.get("before", "")),
-                after=str(row.get("after", "")),
-            ),
-        }
-        for row in edit_plan
-    ]
-    diff_file_count = len(diff_preview)
-    diff_line_count = sum(len(item.get("diff", [])) for item in diff_preview)
+    diff_file_count = len(edit_plan)
+    diff_preview: list[dict[str, Any]] = []
+    diff_line_count = 0
+    planned_paths: list[str] = []
+    planned_edits = 0
+    validation_rows: list[dict[str, Any]] = []
+    failed_validation: list[str] = []
+    for row in edit_plan:
+        path_value = str(row["path"])
+        validation = row["validation"]
+        planned_paths.append(path_value)
+        planned_edits += int(row["edits"])
+        validation_rows.append({"path": row["path"], "validation": validation})
+        if validation.get("result") != "PASS":
+            failed_validation.append(f"validation failed for {path_value}")
+        if as_json:
+            diff = row.pop("diff")
+            diff_preview.append({"path": path_value, "diff": diff})
+            diff_line_count += len(diff)
+    if apply_changes and not as_json:
+        diff_line_count = _count_diff_lines(edit_plan)
 
     blockers: list[str] = []
     if backend == "text" and not allow_text_fallback:
@@ -2085,10 +2739,7 @@ def command_rename(args: list[str]) -> int:
             apply_changes=apply_changes,
         )
     )
-    if any(
-        bool(annotation.get("needs_confirmation", False))
-        for annotation in change_annotations.values()
-    ):
+    if needs_confirmation:
         blockers.append("change annotations require confirmation; apply is blocked")
     if renamefile_operations:
         blockers.extend(_validate_renamefile_operations(root, renamefile_operations))
@@ -2116,23 +2767,20 @@ def command_rename(args: list[str]) -> int:
         blockers.append(
             f"diff review threshold exceeded: lines {diff_line_count}>{max_diff_lines}"
         )
-    for row in edit_plan:
-        if row["validation"].get("result") != "PASS":
-            blockers.append(f"validation failed for {row['path']}")
+    blockers.extend(failed_validation)
 
     applied_files: list[str] = []
     applied_edits = 0
     applied_resource_operations: list[dict[str, str]] = []
     if apply_changes and not blockers:
-        for row in edit_plan:
-            path = root / str(row["path"])
-            path.write_text(str(row["after"]), encoding="utf-8")
-            applied_files.append(str(row["path"]))
-            applied_edits += int(row["edits"])
+        _write_planned_files(root, edit_plan)
+        applied_files = planned_paths
+        applied_edits = planned_edits
         applied_resource_operations, _ = _apply_renamefile_operations(
             root=root,
             operations=renamefile_operations,
         )
+        _invalidate_scope_caches()
 
     result = "PASS" if not blockers else "WARN"
     warnings = _command_warnings(reason_code, lsp_error)
@@ -2153,15 +2801,13 @@ def command_rename(args: list[str]) -> int:
         "apply_requested": apply_changes,
         "applied": bool(apply_changes and not blockers),
         "planned_files": len(edit_plan),
-        "planned_edits": sum(int(row["edits"]) for row in edit_plan),
+        "planned_edits": planned_edits,
         "applied_files": applied_files,
         "applied_edits": applied_edits,
         "applied_resource_operations": applied_resource_operations,
         "warnings": warnings,
-        "blockers": sorted(set(blockers)),
-        "validation": [
-            {"path": row["path"], "validation": row["validation"]} for row in edit_plan
-        ],
+        "blockers": sorted(dict.fromkeys(blockers)),
+        "validation": validation_rows,
         "diff_preview": diff_preview,
         "change_annotations": change_annotations,
         "renamefile_operations": renamefile_operations,
@@ -2193,11 +2839,11 @@ def command_rename(args: list[str]) -> int:
     }
 
     for row in edit_plan:
-        row.pop("before", None)
         row.pop("after", None)
+        row.pop("before", None)
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"applied: {report['applied']}")
@@ -2211,22 +2857,22 @@ def command_rename(args: list[str]) -> int:
 
 
 def _group_by_language(servers: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
-    grouped: dict[str, dict[str, Any]] = {}
+    totals: Counter[str] = Counter()
+    installed: Counter[str] = Counter()
+    members: defaultdict[str, list[Any]] = defaultdict(list)
     for server in servers:
         language = str(server["language"])
-        state = grouped.setdefault(
-            language,
-            {
-                "installed": 0,
-                "total": 0,
-                "servers": [],
-            },
-        )
-        state["total"] = int(state["total"]) + 1
-        if bool(server["installed"]):
-            state["installed"] = int(state["installed"]) + 1
-        state["servers"].append(server["id"])
-    return grouped
+        totals[language] += 1
+        installed[language] += bool(server["installed"])
+        members[language].append(server["id"])
+    return {
+        language: {
+            "installed": installed[language],
+            "total": total,
+            "servers": members[language],
+        }
+        for language, total in totals.items()
+    }
 
 
 CAPABILITY_MATRIX: list[tuple[str, str]] = [
@@ -2382,30 +3028,31 @@ def _probe_server_capabilities(root: Path, server: dict[str, Any]) -> dict[str,
         }
 
 
+STATUS_FLAGS = frozenset({"--json"})
+DOCTOR_FLAGS = frozenset({"--json", "--verbose"})
+
+
 def _doctor_capability_probe(
     root: Path, servers: list[dict[str, Any]]
 ) -> dict[str, Any]:
     server_probes = [
         _probe_server_capabilities(root=root, server=row) for row in servers
     ]
+    capability_indexes = [
+        {item["capability"]: bool(item["supported"]) for item in probe["matrix"]}
+        for probe in server_probes
+        if probe["status"] == "ok"
+    ]
     summary: list[dict[str, Any]] = []
     for key, label in CAPABILITY_MATRIX:
-        supported = 0
-        total = 0
-        for probe in server_probes:
-            if probe["status"] != "ok":
-                continue
-            total += 1
-            for item in probe["matrix"]:
-                if item["capability"] == key and item["supported"]:
-                    supported += 1
-                    break
         summary.append(
             {
                 "capability": key,
                 "label": label,
-                "supported_servers": supported,
-                "probed_servers": total,
+                "supported_servers": sum(
+                    1 for index in capability_indexes if index.get(key, False)
+                ),
+                "probed_servers": len(capability_indexes),
             }
         )
     return {
@@ -2416,7 +3063,7 @@ def _doctor_capability_probe(
 
 
 def command_status(args: list[str]) -> int:
-    if any(arg not in ("--json",) for arg in args):
+    if not STATUS_FLAGS.issuperset(args):
         return usage()
     as_json = "--json" in args
 
@@ -2441,7 +3088,7 @@ def command_status(args: list[str]) -> int:
     }
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"installed: {report['installed']}/{report['total']}")
         for row in servers:
@@ -2453,7 +3100,7 @@ def command_status(args: list[str]) -> int:
 
 
 def command_doctor(args: list[str]) -> int:
-    if any(arg not in ("--json", "--verbose") for arg in args):
+    if not DOCTOR_FLAGS.issuperset(args):
         return usage()
     as_json = "--json" in args
     verbose = "--verbose" in args
@@ -2510,7 +3157,7 @@ def command_doctor(args: list[str]) -> int:
     }
 
     if as_json:
-        print(json.dumps(report, indent=2))
+        _emit_json(report)
     else:
         print(f"result: {report['result']}")
         print(f"installed: {report['installed']}/{report['total']}")
@@ -2541,33 +3188,26 @@ def command_doctor(args: list[str]) -> int:
     return 0
 
 
+COMMANDS: dict[str, Callable[[list[str]], int]] = {
+    "status": command_status,
+    "doctor": command_doctor,
+    "diagnostics": command_diagnostics,
+    "code-actions": command_code_actions,
+    "goto-definition": command_goto_definition,
+    "find-references": command_find_references,
+    "symbols": command_symbols,
+    "prepare-rename": command_prepare_rename,
+    "rename": command_rename,
+}
+
+
 def main(argv: list[str]) -> int:
     if not argv:
         return usage()
-    command = argv[0]
-    rest = argv[1:]
-
-    if command in ("help", "--help", "-h"):
+    handler = COMMANDS.get(argv[0])
+    if handler is None:
         return usage()
-    if command == "status":
-        return command_status(rest)
-    if command == "doctor":
-        return command_doctor(rest)
-    if command == "diagnostics":
-        return command_diagnostics(rest)
-    if command == "code-actions":
-        return command_code_actions(rest)
-    if command == "goto-definition":
-        return command_goto_definition(rest)
-    if command == "find-references":
-        return command_find_references(rest)
-    if command == "symbols":
-        return command_symbols(rest)
-    if command == "prepare-rename":
-        return command_prepare_rename(rest)
-    if command == "rename":
-        return command_rename(rest)
-    return usage()
+    return handler(argv[1:])
 
 
 if __name__ == "__main__":
@@ -5,15 +5,20 @@ from __future__ import annotations
 import json
 import os
 import queue
-import subprocess
 import threading
 import time
 from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Self
+from typing import TYPE_CHECKING, Any, Self
 from urllib.parse import unquote, urlparse
 
+from json_codec import fast_dumps, loads_bytes  # type: ignore
+
+if TYPE_CHECKING:
+    import subprocess
+
 
 MAX_HEADER_BYTES = 64 * 1024
 MAX_BODY_BYTES = 16 * 1024 * 1024
@@ -21,6 +26,7 @@ READ_CHUNK_BYTES = 64 * 1024
 STDOUT_QUEUE_CHUNKS = 32
 WRITE_QUEUE_ITEMS = 4
 STDERR_TAIL_BYTES = 64 * 1024
+LARGE_FRAME_BYTES = 256 * 1024
 _STDOUT_EOF = object()
 _WRITER_STOP = object()
 
@@ -32,7 +38,7 @@ class _PumpFailure:
 
 @dataclass
 class _WriteRequest:
-    data: bytes
+    chunks: list[bytes]
     done: threading.Event = field(default_factory=threading.Event)
     error: BaseException | None = None
 
@@ -41,8 +47,22 @@ class LspTransportError(RuntimeError):
     pass
 
 
+def _encode_body(payload: Any) -> bytes:
+    encoded = fast_dumps(payload)
+    if encoded is None:
+        encoded = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return encoded
+
+
+@lru_cache(maxsize=4096)
+def _resolved_uri(path_value: str, cwd: str) -> str:
+    # ``cwd`` only keys relative paths; resolve() itself reads the live cwd.
+    return Path(path_value).resolve().as_uri()
+
+
 def path_to_uri(path: Path) -> str:
-    return path.resolve().as_uri()
+    value = os.fspath(path)
+    return _resolved_uri(value, "" if os.path.isabs(value) else os.getcwd())
 
 
 def uri_to_path(uri: str) -> Path | None:
@@ -55,19 +75,21 @@ def uri_to_path(uri: str) -> Path | None:
     return Path(path)
 
 
+LANGUAGE_IDS: dict[str, str] = {
+    ".py": "python",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".cjs": "javascript",
+    ".go": "go",
+    ".rs": "rust",
+}
+
+
 def language_id_for_path(path: Path) -> str:
-    suffix = path.suffix.lower()
-    if suffix == ".py":
-        return "python"
-    if suffix in {".ts", ".tsx"}:
-        return "typescript"
-    if suffix in {".js", ".jsx", ".mjs", ".cjs"}:
-        return "javascript"
-    if suffix == ".go":
-        return "go"
-    if suffix == ".rs":
-        return "rust"
-    return "plaintext"
+    return LANGUAGE_IDS.get(path.suffix.lower(), "plaintext")
 
 
 def choose_server_for_path(
@@ -77,9 +99,9 @@ def choose_server_for_path(
     for server in servers:
         if not bool(server.get("installed")):
             continue
-        exts = [str(item).lower() for item in server.get("extensions", [])]
-        if suffix in exts:
-            return server
+        for item in server.get("extensions", ()):
+            if str(item).lower() == suffix:
+                return server
     return None
 
 
@@ -103,6 +125,8 @@ class LspClient:
             maxsize=WRITE_QUEUE_ITEMS
         )
         self._stdout_buffer = bytearray()
+        # (body_start, body_end) once a header is parsed but its body is partial.
+        self._pending_body: tuple[int, int] | None = None
         self._stderr_chunks: deque[bytes] = deque()
         self._stderr_size = 0
         self._stderr_lock = threading.Lock()
@@ -114,6 +138,8 @@ class LspClient:
         self._writer_thread: threading.Thread | None = None
 
     def __enter__(self) -> Self:
+        import subprocess
+
         self._proc = subprocess.Popen(
             self.command,
             stdin=subprocess.PIPE,
@@ -228,12 +254,13 @@ class LspClient:
                 proc = self._proc
                 if proc is None or proc.stdin is None:
                     raise LspTransportError("LSP stdin unavailable")
-                remaining = memoryview(item.data)
-                while remaining:
-                    written = proc.stdin.write(remaining)
-                    if written is None or written <= 0:
-                        raise RuntimeError("LSP stdin write returned no progress")
-                    remaining = remaining[written:]
+                for chunk in item.chunks:
+                    remaining = memoryview(chunk)
+                    while remaining:
+                        written = proc.stdin.write(remaining)
+                        if written is None or written <= 0:
+                            raise RuntimeError("LSP stdin write returned no progress")
+                        remaining = remaining[written:]
                 proc.stdin.flush()
             except Exception as error:  # noqa: BLE001 - writer reports through request.
                 item.error = error
@@ -277,12 +304,26 @@ class LspClient:
         return remaining
 
     def _send(self, payload: dict[str, Any], deadline: float) -> None:
+        self._send_many([payload], deadline)
+
+    def _send_many(self, payloads: list[dict[str, Any]], deadline: float) -> None:
         self._require_proc()
-        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
-        if len(body) > MAX_BODY_BYTES:
-            raise LspTransportError("LSP outgoing message exceeds body limit")
-        header = f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
-        item = _WriteRequest(header + body)
+        chunks: list[bytes] = []
+        pending: list[bytes] = []
+        for payload in payloads:
+            body = _encode_body(payload)
+            if len(body) > MAX_BODY_BYTES:
+                raise LspTransportError("LSP outgoing message exceeds body limit")
+            pending.append(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+            if len(body) < LARGE_FRAME_BYTES:
+                pending.append(body)
+                continue
+            chunks.append(b"".join(pending))
+            chunks.append(body)
+            pending.clear()
+        if pending:
+            chunks.append(b"".join(pending))
+        item = _WriteRequest(chunks)
         try:
             self._write_queue.put(
                 item,
@@ -305,20 +346,30 @@ class LspClient:
         )
 
     def _request(self, method: str, params: Any) -> Any:
-        request_id = self._next_id
-        self._next_id += 1
+        return self._request_many([(method, params)])[0]
+
+    def _request_many(self, calls: list[tuple[str, Any]]) -> list[Any]:
+        first_id = self._next_id
+        self._next_id += len(calls)
+        methods = {
+            first_id + offset: method for offset, (method, _params) in enumerate(calls)
+        }
+        results: dict[int, Any] = {}
         deadline = time.monotonic() + self.timeout_seconds
         try:
-            self._send(
-                {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "method": method,
-                    "params": params,
-                },
+            self._send_many(
+                [
+                    {
+                        "jsonrpc": "2.0",
+                        "id": first_id + offset,
+                        "method": method,
+                        "params": params,
+                    }
+                    for offset, (method, params) in enumerate(calls)
+                ],
                 deadline,
             )
-            while True:
+            while len(results) < len(calls):
                 message = self._read_message(deadline)
                 if "method" in message and "id" in message:
                     self._send(
@@ -333,22 +384,51 @@ class LspClient:
                         deadline,
                     )
                     continue
-                if "id" not in message or message.get("id") != request_id:
+                message_id = message.get("id")
+                if isinstance(message_id, (dict, list)) or message_id not in methods:
+                    continue
+                if message_id in results:
                     continue
                 if message.get("error"):
                     response_error = message["error"]
-                    raise RuntimeError(f"LSP error {method}: {response_error}")
-                return message.get("result")
+                    raise RuntimeError(
+                        f"LSP error {methods[message_id]}: {response_error}"
+                    )
+                results[message_id] = message.get("result")
+            return [results[request_id] for request_id in methods]
         except TimeoutError as error:
             self._finish_process(force=True)
-            raise TimeoutError(f"LSP request timeout: {method}") from error
+            pending = [name for key, name in methods.items() if key not in results]
+            raise TimeoutError(f"LSP request timeout: {pending[0]}") from error
         except LspTransportError:
             self._finish_process(force=True)
             raise
 
     def _parse_buffered_message(self) -> dict[str, Any] | None:
-        crlf_index = self._stdout_buffer.find(b"\r\n\r\n")
-        lf_index = self._stdout_buffer.find(b"\n\n")
+        if self._pending_body is None:
+            self._pending_body = self._parse_buffered_header()
+            if self._pending_body is None:
+                return None
+        body_start, body_end = self._pending_body
+        if len(self._stdout_buffer) < body_end:
+            return None
+        self._pending_body = None
+        with memoryview(self._stdout_buffer) as view:
+            body = bytes(view[body_start:body_end])
+        del self._stdout_buffer[:body_end]
+        try:
+            parsed = loads_bytes(body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as error:
+            raise LspTransportError("LSP message body is invalid JSON") from error
+        if not isinstance(parsed, dict):
+            raise LspTransportError("LSP message must be JSON object")
+        return parsed
+
+    def _parse_buffered_header(self) -> tuple[int, int] | None:
+        # Delimiters past the header limit are errors, so never scan further.
+        search_end = MAX_HEADER_BYTES + 4
+        crlf_index = self._stdout_buffer.find(b"\r\n\r\n", 0, search_end)
+        lf_index = self._stdout_buffer.find(b"\n\n", 0, search_end)
         candidates = [
             (index, delimiter)
             for index, delimiter in ((crlf_index, 4), (lf_index, 2))
@@ -370,8 +450,8 @@ class LspClient:
             if name.strip().lower() != b"content-length":
                 continue
             try:
-                lengths.append(int(value.strip().decode("ascii")))
-            except (UnicodeDecodeError, ValueError) as error:
+                lengths.append(int(value))
+            except ValueError as error:
                 raise LspTransportError("LSP message has invalid content length") from error
         if not lengths:
             raise LspTransportError("LSP message missing content length")
@@ -383,18 +463,7 @@ class LspClient:
         if content_length > MAX_BODY_BYTES:
             raise LspTransportError("LSP response body exceeds limit")
         body_start = header_end + delimiter_size
-        body_end = body_start + content_length
-        if len(self._stdout_buffer) < body_end:
-            return None
-        body = bytes(self._stdout_buffer[body_start:body_end])
-        del self._stdout_buffer[:body_end]
-        try:
-            parsed = json.loads(body.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as error:
-            raise LspTransportError("LSP message body is invalid JSON") from error
-        if not isinstance(parsed, dict):
-            raise LspTransportError("LSP message must be JSON object")
-        return parsed
+        return body_start, body_start + content_length
 
     def _read_message(self, deadline: float) -> dict[str, Any]:
         while True:
@@ -426,6 +495,8 @@ class LspClient:
         ]
 
     def _finish_process(self, force: bool) -> None:
+        import subprocess
+
         with self._close_lock:
             if self._transport_closed:
                 return
@@ -470,10 +541,10 @@ class LspClient:
         for thread in threads:
             thread.join(timeout=1)
 
-    def ensure_open(self, path: Path) -> None:
+    def ensure_open(self, path: Path) -> str:
         uri = path_to_uri(path)
         if uri in self._opened:
-            return
+            return uri
         text = path.read_text(encoding="utf-8", errors="replace")
         self._notify(
             "textDocument/didOpen",
@@ -487,15 +558,16 @@ class LspClient:
             },
         )
         self._opened.add(uri)
+        return uri
 
     def goto_definition(
         self, path: Path, line0: int, char0: int
     ) -> list[dict[str, Any]]:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
             "textDocument/definition",
             {
-                "textDocument": {"uri": path_to_uri(path)},
+                "textDocument": {"uri": uri},
                 "position": {"line": line0, "character": char0},
             },
         )
@@ -510,11 +582,11 @@ class LspClient:
     def find_references(
         self, path: Path, line0: int, char0: int
     ) -> list[dict[str, Any]]:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
             "textDocument/references",
             {
-                "textDocument": {"uri": path_to_uri(path)},
+                "textDocument": {"uri": uri},
                 "position": {"line": line0, "character": char0},
                 "context": {"includeDeclaration": True},
             },
@@ -524,14 +596,20 @@ class LspClient:
         return [item for item in result if isinstance(item, dict)]
 
     def document_symbols(self, path: Path) -> list[dict[str, Any]]:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
-            "textDocument/documentSymbol", {"textDocument": {"uri": path_to_uri(path)}}
+            "textDocument/documentSymbol", {"textDocument": {"uri": uri}}
         )
         if not isinstance(result, list):
             return []
         return [item for item in result if isinstance(item, dict)]
 
+    def batch(self, requests: list[tuple[str, Any]]) -> list[Any]:
+        # Pipelines (method, params) requests; results keep request order.
+        if not requests:
+            return []
+        return self._request_many(requests)
+
     def workspace_symbols(self, query: str) -> list[dict[str, Any]]:
         result = self._request("workspace/symbol", {"query": query})
         if not isinstance(result, list):
@@ -541,11 +619,11 @@ class LspClient:
     def prepare_rename(
         self, path: Path, line0: int, char0: int
     ) -> dict[str, Any] | None:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
             "textDocument/prepareRename",
             {
-                "textDocument": {"uri": path_to_uri(path)},
+                "textDocument": {"uri": uri},
                 "position": {"line": line0, "character": char0},
             },
         )
@@ -556,11 +634,11 @@ class LspClient:
     def rename(
         self, path: Path, line0: int, char0: int, new_name: str
     ) -> dict[str, Any] | None:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
             "textDocument/rename",
             {
-                "textDocument": {"uri": path_to_uri(path)},
+                "textDocument": {"uri": uri},
                 "position": {"line": line0, "character": char0},
                 "newName": new_name,
             },
@@ -570,11 +648,11 @@ class LspClient:
         return None
 
     def document_diagnostics(self, path: Path) -> list[dict[str, Any]]:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
             "textDocument/diagnostic",
             {
-                "textDocument": {"uri": path_to_uri(path)},
+                "textDocument": {"uri": uri},
             },
         )
         if isinstance(result, dict):
@@ -592,11 +670,11 @@ class LspClient:
         char0: int,
         diagnostics: list[dict[str, Any]] | None = None,
     ) -> list[dict[str, Any]]:
-        self.ensure_open(path)
+        uri = self.ensure_open(path)
         result = self._request(
             "textDocument/codeAction",
             {
-                "textDocument": {"uri": path_to_uri(path)},
+                "textDocument": {"uri": uri},
                 "range": {
                     "start": {"line": line0, "character": char0},
                     "end": {"line": line0, "character": char0},
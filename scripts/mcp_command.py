@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import json
-import re
 import sys
 from pathlib import Path
 
@@ -22,6 +21,7 @@ from playwright_defaults import (  # type: ignore
 )
 
 CONFIG_PATH = resolve_write_path()
+HTTP_URL_PREFIXES = ("http://", "https://")
 ACTIVE_SERVERS = (
     "context7",
     "gh_grep",
@@ -211,7 +211,7 @@ def collect_doctor(mcp: dict) -> dict:
         if kind == "remote":
             if not url:
                 problems.append(f"{name} url is missing")
-            elif not re.match(r"^https?://", url):
+            elif not url.startswith(HTTP_URL_PREFIXES):
                 problems.append(f"{name} url is invalid: {url}")
         elif kind == "local":
             if not command:
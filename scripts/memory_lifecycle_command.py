@@ -12,6 +12,7 @@ from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+from json_codec import fast_dumps, loads_bytes  # type: ignore
 from shared_memory_runtime import (  # type: ignore
     _row_to_record,
     _upsert_fts,
@@ -199,10 +200,18 @@ def usage() -> int:
     return 2
 
 
+def _write_json_file(path: Path, payload: Any) -> None:
+    encoded = fast_dumps(payload, indent=True)
+    if encoded is not None:
+        path.write_bytes(encoded)
+        return
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
 def load_store(path: Path) -> dict[str, Any]:
     if not path.exists():
         return {"version": 1, "entries": [], "archive": []}
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw = loads_bytes(path.read_bytes())
     if not isinstance(raw, dict):
         return {"version": 1, "entries": [], "archive": []}
     entries = raw.get("entries") if isinstance(raw.get("entries"), list) else []
@@ -216,7 +225,7 @@ def load_store(path: Path) -> dict[str, Any]:
 
 def save_store(path: Path, payload: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    _write_json_file(path, payload)
 
 
 def parse_flag_value(argv: list[str], flag: str) -> str | None:
@@ -953,7 +962,7 @@ def cmd_export(argv: list[str]) -> int:
     conn = connect()
     store = _export_payload(conn)
     target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(json.dumps(store, indent=2) + "\n", encoding="utf-8")
+    _write_json_file(target, store)
     return emit(
         {
             "result": "PASS",
@@ -987,7 +996,7 @@ def cmd_import(argv: list[str]) -> int:
             },
             as_json,
         )
-    incoming = json.loads(source.read_text(encoding="utf-8"))
+    incoming = loads_bytes(source.read_bytes())
     if not isinstance(incoming, dict):
         return emit(
             {
@@ -1025,7 +1034,7 @@ def cmd_import(argv: list[str]) -> int:
         )
     conn = connect()
     backup_path = source.with_name(f"{source.stem}.pre-import-{uuid.uuid4().hex}.json")
-    backup_path.write_text(json.dumps(_export_payload(conn), indent=2) + "\n", encoding="utf-8")
+    _write_json_file(backup_path, _export_payload(conn))
     try:
         conn.execute("BEGIN")
         skipped = 0
@@ -21,7 +21,7 @@ from config_layering import (  # type: ignore
 from model_routing_schema import (  # type: ignore
     default_schema,
     resolve_model_settings,
-    validate_schema,
+    validated_default_schema,
 )
 
 
@@ -191,7 +191,7 @@ def parse_value(argv: list[str], flag: str) -> str | None:
 def parse_available_models(raw: str | None) -> set[str] | None:
     if not raw:
         return None
-    parts = {item.strip() for item in raw.split(",") if item.strip()}
+    parts = {part for part in (item.strip() for item in raw.split(",")) if part}
     return parts if parts else None
 
 
@@ -330,8 +330,7 @@ def _recommend_for_agent(agent_name: str) -> dict[str, Any]:
 
 
 def run_resolve(state: dict[str, Any], argv: list[str]) -> dict[str, Any]:
-    schema = default_schema()
-    problems = validate_schema(schema)
+    schema, problems = validated_default_schema()
     if problems:
         return {"result": "FAIL", "problems": problems}
 
@@ -376,8 +375,7 @@ def resolve_for_entrypoint(
     user_overrides: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     _, state, _ = load_state_snapshot(persist_missing=False)
-    schema = default_schema()
-    problems = validate_schema(schema)
+    schema, problems = validated_default_schema()
     if problems:
         return {
             "result": "FAIL",
@@ -520,8 +518,7 @@ def command_doctor(argv: list[str]) -> int:
         return usage()
     json_output = "--json" in argv
     _, state, write_path = load_state_snapshot(persist_missing=False)
-    schema = default_schema()
-    problems = validate_schema(schema)
+    schema, problems = validated_default_schema()
     categories = schema.get("categories", {}) if isinstance(schema.get("categories"), dict) else {}
     parity_warnings = _routing_profile_parity_warnings(schema)
     warnings = list(parity_warnings)
@@ -103,6 +103,17 @@ def validate_schema(schema: dict[str, Any]) -> list[str]:
     return problems
 
 
+@lru_cache(maxsize=1)
+def _default_schema_problems() -> tuple[str, ...]:
+    return tuple(validate_schema(default_schema()))
+
+
+def validated_default_schema() -> tuple[dict[str, Any], list[str]]:
+    # The default schema is built from cached shared data, so it only needs
+    # validating once per process; callers still get fresh, mutable copies.
+    return default_schema(), list(_default_schema_problems())
+
+
 def resolve_category(
     schema: dict[str, Any],
     requested_category: str | None,
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 
@@ -182,6 +183,18 @@ def evaluate_semantic_capability(
     }
 
 
+@lru_cache(maxsize=256)
+def word_boundary_pattern(symbol: str) -> re.Pattern[str]:
+    return re.compile(rf"\b{re.escape(symbol)}\b")
+
+
+def _count_word_references(text: str, name: str) -> int:
+    # A plain substring miss rules out any word-boundary match.
+    if name not in text:
+        return 0
+    return len(word_boundary_pattern(name).findall(text))
+
+
 def validate_changed_references(
     before: str, after: str, old_symbol: str, new_symbol: str
 ) -> dict:
@@ -195,12 +208,9 @@ def validate_changed_references(
             "remaining_old_references": 0,
         }
 
-    old_pattern = re.compile(rf"\b{re.escape(old_name)}\b")
-    new_pattern = re.compile(rf"\b{re.escape(new_name)}\b")
-    before_old = len(old_pattern.findall(before))
-    after_old = len(old_pattern.findall(after))
-    before_new = len(new_pattern.findall(before))
-    after_new = len(new_pattern.findall(after))
+    after_old = _count_word_references(after, old_name)
+    before_new = _count_word_references(before, new_name)
+    after_new = _count_word_references(after, new_name)
     changed = max(0, after_new - before_new)
 
     ok = changed > 0 and after_old == 0
@@ -143,6 +143,22 @@ class LayeredConfigTransactionTest(unittest.TestCase):
                     with self.assertRaises((ValueError, json.JSONDecodeError)):
                         _load_json_or_jsonc(path)
 
+    def test_config_parse_cache_returns_copies_and_tracks_changes(self) -> None:
+        with self.isolated() as (root, _home, _project):
+            config = root / "cached.jsonc"
+            _write_config(config, {"mcp": {"servers": ["a"]}})
+            first = _load_json_or_jsonc(config)
+            first["mcp"]["servers"].append("mutated")
+            with mock.patch.object(layering, "_strip_jsonc") as strip:
+                second = _load_json_or_jsonc(config)
+            strip.assert_not_called()
+            self.assertEqual({"mcp": {"servers": ["a"]}}, second)
+
+            _write_config(config, {"mcp": {"servers": ["a", "b"]}})
+            self.assertEqual(
+                {"mcp": {"servers": ["a", "b"]}}, _load_json_or_jsonc(config)
+            )
+
     def test_noop_preserves_exact_file_metadata(self) -> None:
         with self.isolated() as (root, _home, _project):
             config = root / "config.json"
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = ROOT / "scripts"
+if str(SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS))
+
+import lsp_command
+
+
+class LspCommandScanTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp = tempfile.TemporaryDirectory(prefix="lsp-command-test-")
+        self.root = Path(self.temp.name).resolve()
+
+    def tearDown(self) -> None:
+        self.temp.cleanup()
+
+    def write(self, relative: str, text: str) -> Path:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def test_parallel_scans_preserve_file_order(self) -> None:
+        files = [
+            self.write(f"pkg/mod_{index:02d}.py", f"def foo():\n    return {index}\n")
+            for index in range(lsp_command.PARALLEL_SCAN_MIN_FILES * 3)
+        ]
+
+        references = lsp_command._scan_references("foo", files, self.root)
+        definitions = lsp_command._scan_definitions("foo", files, self.root)
+
+        expected = [str(path.relative_to(self.root)) for path in files]
+        self.assertEqual([row["path"] for row in references], expected)
+        self.assertEqual([row["path"] for row in definitions], expected)
+
+    def test_shallow_wildcard_scope_matches_glob_results(self) -> None:
+        self.write("packages/one/main.py", "x = 1\n")
+        self.write("packages/two/main.py", "x = 2\n")
+        self.write("packages/two/other.py", "x = 3\n")
+        self.write("packages/node_modules/main.py", "x = 4\n")
+
+        self.assertEqual(
+            lsp_command._try_decompose_shallow_wildcard("packages/*/main.py"),
+            ("packages", "main.py"),
+        )
+        self.assertIsNone(lsp_command._try_decompose_shallow_wildcard("src/**/a.py"))
+        self.assertIsNone(lsp_command._try_decompose_shallow_wildcard("src/*.py"))
+
+        discovered = lsp_command._discover_files(self.root, ["packages/*/main.py"])
+        self.assertEqual(
+            [str(path.relative_to(self.root)) for path in discovered],
+            ["packages/one/main.py", "packages/two/main.py"],
+        )
+
+    def test_recursive_scope_walk_matches_pathlib_glob(self) -> None:
+        self.write("src/a.py", "x = 1\n")
+        self.write("src/pkg/b.py", "x = 2\n")
+        self.write("src/pkg/c.ts", "x = 3\n")
+        self.write("src/.hidden/d.py", "x = 4\n")
+        self.write("src/node_modules/e.py", "x = 5\n")
+        self.write("src/pkg/__pycache__/f.py", "x = 6\n")
+        (self.root / "src" / "alias").symlink_to(self.root / "src" / "pkg")
+
+        for pattern in ("src/**/*.py", "**/*", "src/*/*.py", "**/pkg/*"):
+            with self.subTest(pattern=pattern):
+                expected = sorted(
+                    {
+                        path.resolve()
+                        for path in self.root.glob(pattern)
+                        if path.is_file()
+                        and path.suffix in lsp_command.SUPPORTED_EXTENSIONS
+                        and not set(path.parts) & lsp_command.IGNORED_DIRS
+                    },
+                    key=str,
+                )
+                self.assertEqual(
+                    lsp_command._discover_files(self.root, [pattern]), expected
+                )
+
+    def test_trailing_slash_scope_selects_no_files(self) -> None:
+        self.write("lib/main.py", "x = 1\n")
+        self.write("src/a.py", "x = 2\n")
+
+        for pattern in ("lib/*/", "src/a.py/", "*/main.py/", "src/**/*/"):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(lsp_command._discover_files(self.root, [pattern]), [])
+        self.assertEqual(
+            lsp_command._discover_scope(self.root, ["src/**/*/", "src/a.py"]),
+            [self.root / "src/a.py"],
+        )
+
+    def test_scope_discovery_sees_deleted_and_new_files(self) -> None:
+        self.write("src/a.py", "x = 1\n")
+        patterns = ["src/a.py", "src/b.py"]
+        self.assertEqual(
+            lsp_command._discover_scope(self.root, patterns), [self.root / "src/a.py"]
+        )
+
+        (self.root / "src" / "a.py").unlink()
+        self.write("src/b.py", "x = 2\n")
+
+        self.assertEqual(
+            lsp_command._discover_scope(self.root, patterns), [self.root / "src/b.py"]
+        )
+
+    def test_normalize_scope_drops_duplicate_and_covered_patterns(self) -> None:
+        self.assertEqual(
+            lsp_command._normalize_scope(
+                ["src/**/*.py", "src/*.py", "src/**/*.py", "src/pkg/*.py", "*.ts"]
+            ),
+            ["*.ts", "src/**/*.py", "src/pkg/*.py"],
+        )
+        self.assertEqual(
+            lsp_command._normalize_scope(["src/**/*", "src/a.py", "lib/*/x.py"]),
+            ["lib/*/x.py", "src/**/*"],
+        )
+
+    def test_workspace_edit_plan_flags_confirmation_annotations(self) -> None:
+        target = self.write("pkg/mod.py", "def foo():\n    return foo\n")
+        edit = {
+            "changes": {
+                target.as_uri(): [
+                    {
+                        "range": {
+                            "start": {"line": 0, "character": 4},
+                            "end": {"line": 0, "character": 7},
+                        },
+                        "newText": "bar",
+                        "annotationId": "confirm",
+                    },
+                    {
+                        "range": {
+                            "start": {"line": 1, "character": 11},
+                            "end": {"line": 1, "character": 14},
+                        },
+                        "newText": "bar",
+                    },
+                ]
+            },
+            "changeAnnotations": {
+                "confirm": {"label": "Rename", "needsConfirmation": True},
+                "unused": {"label": "Unused", "needsConfirmation": True},
+            },
+        }
+
+        plan, resource_operations, annotations, needs_confirmation = (
+            lsp_command._edit_plan_from_workspace_edit(
+                edit, self.root, "foo", "bar", keep_after=True
+            )
+        )
+
+        self.assertEqual(resource_operations, [])
+        self.assertEqual(list(annotations), ["confirm"])
+        self.assertTrue(needs_confirmation)
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(plan[0]["after"], "def bar():\n    return bar\n")
+        self.assertEqual(plan[0]["validation"]["result"], "PASS")
+
+    def test_word_replace_fast_path_matches_regex_subn(self) -> None:
+        samples = [
+            "foo foo_bar barfoo foo.bar (foo) foo",
+            "foofoo foo1 1foo _foo foo_ foo",
+            "éfoo fooé foo foo",
+            "aaa aa aaaa a aa",
+            "",
+        ]
+        for symbol in ("foo", "aa", "a"):
+            pattern = lsp_command.word_boundary_pattern(symbol)
+            for text in samples:
+                with self.subTest(symbol=symbol, text=text):
+                    self.assertEqual(
+                        lsp_command._word_replace(text, symbol, "renamed"),
+                        pattern.subn("renamed", text),
+                    )
+
+    def test_write_planned_files_writes_every_row(self) -> None:
+        count = lsp_command.PARALLEL_SCAN_MIN_FILES * 2
+        plan = [
+            {"path": f"pkg/mod_{index}.py", "after": f"value = {index}\n"}
+            for index in range(count)
+        ]
+        for row in plan:
+            self.write(str(row["path"]), "old\n")
+
+        lsp_command._write_planned_files(self.root, plan)
+
+        for index in range(count):
+            self.assertEqual(
+                (self.root / f"pkg/mod_{index}.py").read_text(encoding="utf-8"),
+                f"value = {index}\n",
+            )
+        self.assertTrue(all("after" not in row for row in plan))
+
+    def test_whole_text_definition_scan_stays_within_lines(self) -> None:
+        path = self.write(
+            "pkg/mod.py",
+            "def\nfoo():\n\n    def foo(x):\n  class foo: foo = foo\nclass\tfoo\n",
+        )
+
+        definitions = lsp_command._scan_definitions("foo", [path], self.root)
+        symbols = lsp_command._extract_symbols(path, self.root)
+
+        self.assertEqual([row["line"] for row in definitions], [4, 5, 6])
+        self.assertEqual(definitions[1]["text"], "class foo: foo = foo")
+        self.assertEqual(
+            [(row["name"], row["line"]) for row in symbols],
+            [("foo", 4), ("foo", 5), ("foo", 6)],
+        )
+
+    def test_binary_lookup_is_cached_per_path(self) -> None:
+        binary = self.write("bin/fake-lsp", "#!/bin/sh\n")
+        binary.chmod(0o755)
+        bin_dir = str(binary.parent)
+        empty_dir = str(self.root)
+
+        with mock.patch.dict(os.environ, {"PATH": bin_dir}):
+            self.assertTrue(lsp_command._is_installed("fake-lsp"))
+        with mock.patch.dict(os.environ, {"PATH": empty_dir}):
+            self.assertFalse(lsp_command._is_installed("fake-lsp"))
+            self.assertTrue(lsp_command._is_installed(str(binary)))
+            self.assertFalse(lsp_command._is_installed(str(self.root / "missing")))
+        with mock.patch.object(lsp_command.shutil, "which") as which:
+            with mock.patch.dict(os.environ, {"PATH": bin_dir}):
+                self.assertTrue(lsp_command._is_installed("fake-lsp"))
+            which.assert_not_called()
+
+    def test_text_apply_blocker_reports_exact_diff_line_count(self) -> None:
+        for index in range(2):
+            self.write(f"pkg/mod_{index}.py", "foo = 1\n" + "x = 0\n" * 6 + "y = foo\n")
+        args = [
+            "rename",
+            "--symbol",
+            "foo",
+            "--new-name",
+            "bar",
+            "--scope",
+            "pkg/*.py",
+            "--allow-text-fallback",
+            "--max-diff-lines",
+            "10",
+            "--apply",
+        ]
+
+        def run(extra: list[str]) -> str:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(lsp_command.main(args + extra), 0)
+            return output.getvalue()
+
+        previous = os.getcwd()
+        os.chdir(self.root)
+        try:
+            with mock.patch.dict(os.environ, {"PATH": str(self.root)}):
+                lsp_command._invalidate_scope_caches()
+                expected = json.loads(run(["--json"]))["diff_line_count"]
+                lsp_command._invalidate_scope_caches()
+                text = run([])
+        finally:
+            os.chdir(previous)
+
+        self.assertGreater(expected, 11)
+        self.assertIn(
+            f"- blocker: diff review threshold exceeded: lines {expected}>10", text
+        )
+        self.assertIn("applied: False", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,8 @@ SCRIPTS = ROOT / "scripts"
 if str(SCRIPTS) not in sys.path:
     sys.path.insert(0, str(SCRIPTS))
 
+import json_codec
+import lsp_rpc_client
 from lsp_rpc_client import LspClient, STDERR_TAIL_BYTES
 
 
@@ -49,6 +51,36 @@ class LspClientTransportTest(unittest.TestCase):
                     self.assertEqual(client.workspace_symbols("needle"), [])
                 self.assert_transport_closed(client)
 
+    def test_batch_pipelines_requests_and_keeps_order(self) -> None:
+        source = self.root / "main.py"
+        source.write_text("def main():\n    pass\n", encoding="utf-8")
+        for scenario in ("normal", "fragmented"):
+            with self.subTest(scenario=scenario):
+                client = LspClient(self.command(scenario), self.root, timeout_seconds=1.5)
+                with client:
+                    self.assertEqual(client.batch([]), [])
+                    results = client.batch(
+                        [
+                            ("textDocument/documentSymbol", {"textDocument": {}}),
+                            ("workspace/symbol", {"query": "main"}),
+                            ("textDocument/hover", {}),
+                        ]
+                    )
+                self.assertEqual(results, [[{"name": "main", "kind": 12}], [], None])
+                self.assert_transport_closed(client)
+
+    def test_body_codec_round_trips_and_falls_back_to_stdlib(self) -> None:
+        payload = {"id": 1, "result": {"name": "caf\u00e9 \U0001f600", "line": 2**31}}
+        body = lsp_rpc_client._encode_body(payload)
+        self.assertEqual(json.loads(body.decode("utf-8")), payload)
+        self.assertEqual(json_codec.loads_bytes(body), payload)
+        self.assertEqual(
+            json_codec.loads_bytes(b'{"value":"\\ud800","n":NaN}')["value"],
+            "\ud800",
+        )
+        with self.assertRaises(json.JSONDecodeError):
+            json_codec.loads_bytes(b"{")
+
     def test_server_request_gets_method_not_found_reply(self) -> None:
         marker = self.root / "server-request-reply.json"
         previous = os.environ.get("FAKE_LSP_RESULT_PATH")